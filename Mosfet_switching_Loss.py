@@ -1,5 +1,6 @@
 import sys
 import csv
+import numpy as np
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QTabWidget, QPushButton, QFileDialog, QLabel, QHBoxLayout)
 from PySide6.QtCore import Qt
@@ -71,6 +72,22 @@ class SwitchingAnalysisApp(QMainWindow):
         self.reverse_recovery_chart = self.create_chart("Reverse Recovery")
         self.vgs_transient_chart = self.create_chart("VGS Transient")
         
+        # Series are created once per chart and refilled in place on every load
+        #transient_channels = [("VGS", QColor("#5B9BD5"), 'vgs'),  # Light blue
+        #                      ("VDS", QColor("#ED7D31"), 'vds'),  # Orange
+        #                      ("IS", QColor("#70AD47"), 'is')]    # Green
+        transient_channels = [("VGS", QColor(Qt.blue), 'vgs'),
+                              ("VDS", QColor(Qt.red), 'vds'),
+                              ("IS", QColor(Qt.green), 'is')]
+        self.chart_series = {
+            self.turn_off_chart: self.add_chart_series(self.turn_off_chart, transient_channels),
+            self.turn_on_chart: self.add_chart_series(self.turn_on_chart, transient_channels),
+            self.reverse_recovery_chart: self.add_chart_series(
+                self.reverse_recovery_chart, [("IRR", QColor(Qt.blue), 'is')]),
+            self.vgs_transient_chart: self.add_chart_series(
+                self.vgs_transient_chart, [("VGS", QColor(Qt.magenta), 'vgs')]),
+        }
+        
         # Create chart views
         self.turn_off_view = QChartView(self.turn_off_chart)
         self.turn_on_view = QChartView(self.turn_on_chart)
@@ -90,6 +107,7 @@ class SwitchingAnalysisApp(QMainWindow):
         self.tabs.addTab(self.vgs_transient_view, "VGS Transient")
         
         self.data = None
+        self.arrays = None
 
     def create_chart(self, title):
         chart = QChart()
@@ -130,6 +148,33 @@ class SwitchingAnalysisApp(QMainWindow):
         series.setPen(pen)
         return series
 
+    def add_chart_series(self, chart, channels):
+        """Create and attach one series per (name, color, channel), returning (series, channel) pairs."""
+        result = []
+        for name, color, channel in channels:
+            series = self.create_series(name, color)
+            chart.addSeries(series)
+            series.attachAxis(chart.axes(Qt.Horizontal)[0])
+            series.attachAxis(chart.axes(Qt.Vertical)[0])
+            result.append((series, channel))
+        return result
+
+    def update_chart_series(self, chart):
+        """Swap each series of a chart to its full channel in one replace."""
+        time = self.arrays['time']
+        lows, highs = [], []
+        for series, channel in self.chart_series[chart]:
+            values = self.arrays[channel]
+            series.replaceNp(time, values)
+            if len(values):
+                lows.append(values.min())
+                highs.append(values.max())
+
+        # Series keep their axes between loads, so rescale them explicitly
+        if lows:
+            chart.axes(Qt.Horizontal)[0].setRange(float(time[0]), float(time[-1]))
+            chart.axes(Qt.Vertical)[0].setRange(float(min(lows)), float(max(highs)))
+
     def load_data(self):
         filename, _ = QFileDialog.getOpenFileName(self, "Load Data", "", "CSV Files (*.csv)")
         if filename:
@@ -149,6 +194,10 @@ class SwitchingAnalysisApp(QMainWindow):
                 self.data['vds'].append(float(row['Vds']))
                 self.data['is'].append(float(row['Is']))
 
+        # Contiguous copies for handing whole channels to the chart series
+        self.arrays = {name: np.asarray(values, dtype=np.float64)
+                       for name, values in self.data.items()}
+
     def process_and_plot_data(self):
         if not self.data:
             return
@@ -162,80 +211,29 @@ class SwitchingAnalysisApp(QMainWindow):
     def clear_charts(self):
         for chart in [self.turn_off_chart, self.turn_on_chart, 
                      self.reverse_recovery_chart, self.vgs_transient_chart]:
-            chart.removeAllSeries()
+            for series, _ in self.chart_series[chart]:
+                series.clear()
 
     def plot_turn_off_transient(self):
-        #vgs_series = self.create_series("VGS", QColor("#5B9BD5"))  # Light blue
-        #vds_series = self.create_series("VDS", QColor("#ED7D31"))  # Orange
-        #is_series = self.create_series("IS", QColor("#70AD47"))    # Green
-        vgs_series = self.create_series("VGS", QColor(Qt.blue))
-        vds_series = self.create_series("VDS", QColor(Qt.red))
-        is_series = self.create_series("IS", QColor(Qt.green))
-        
-        for i in range(len(self.data['time'])):
-            vgs_series.append(self.data['time'][i], self.data['vgs'][i])
-            vds_series.append(self.data['time'][i], self.data['vds'][i])
-            is_series.append(self.data['time'][i], self.data['is'][i])
-        
-        self.turn_off_chart.addSeries(vgs_series)
-        self.turn_off_chart.addSeries(vds_series)
-        self.turn_off_chart.addSeries(is_series)
-        
-        for series in [vgs_series, vds_series, is_series]:
-            series.attachAxis(self.turn_off_chart.axes()[0])
-            series.attachAxis(self.turn_off_chart.axes()[1])
+        self.update_chart_series(self.turn_off_chart)
         
         params = self.calculate_turn_off_params()
         self.add_turn_off_annotations(params)
 
     def plot_turn_on_transient(self):
-        #vgs_series = self.create_series("VGS", QColor("#5B9BD5"))  # Light blue
-        #vds_series = self.create_series("VDS", QColor("#ED7D31"))  # Orange
-        #is_series = self.create_series("IS", QColor("#70AD47"))    # Green
-        vgs_series = self.create_series("VGS", QColor(Qt.blue))
-        vds_series = self.create_series("VDS", QColor(Qt.red))
-        is_series = self.create_series("IS", QColor(Qt.green))
-        
-        for i in range(len(self.data['time'])):
-            vgs_series.append(self.data['time'][i], self.data['vgs'][i])
-            vds_series.append(self.data['time'][i], self.data['vds'][i])
-            is_series.append(self.data['time'][i], self.data['is'][i])
-        
-        self.turn_on_chart.addSeries(vgs_series)
-        self.turn_on_chart.addSeries(vds_series)
-        self.turn_on_chart.addSeries(is_series)
-        
-        for series in [vgs_series, vds_series, is_series]:
-            series.attachAxis(self.turn_on_chart.axes()[0])
-            series.attachAxis(self.turn_on_chart.axes()[1])
+        self.update_chart_series(self.turn_on_chart)
         
         params = self.calculate_turn_on_params()
         self.add_turn_on_annotations(params)
     
     def plot_reverse_recovery(self):
-        #current_series = self.create_series("IRR", QColor("#5B9BD5"))  # Light blue
-        current_series = self.create_series("IRR", QColor(Qt.blue))
-        
-        for i in range(len(self.data['time'])):
-            current_series.append(self.data['time'][i], self.data['is'][i])
-        
-        self.reverse_recovery_chart.addSeries(current_series)
-        current_series.attachAxis(self.reverse_recovery_chart.axes()[0])
-        current_series.attachAxis(self.reverse_recovery_chart.axes()[1])
+        self.update_chart_series(self.reverse_recovery_chart)
         
         params = self.calculate_reverse_recovery_params()
         self.add_reverse_recovery_annotations(params)
 
     def plot_vgs_transient(self):
-        #vgs_series = self.create_series("VGS", QColor("#C586C0"))  # Light purple
-        vgs_series = self.create_series("VGS", QColor(Qt.magenta))
-        
-        for i in range(len(self.data['time'])):
-            vgs_series.append(self.data['time'][i], self.data['vgs'][i])
-        
-        self.vgs_transient_chart.addSeries(vgs_series)
-        vgs_series.attachAxis(self.vgs_transient_chart.axes()[0])
-        vgs_series.attachAxis(self.vgs_transient_chart.axes()[1])
+        self.update_chart_series(self.vgs_transient_chart)
         
         params = self.calculate_vgs_transient_params()
         self.add_vgs_transient_annotations(params)
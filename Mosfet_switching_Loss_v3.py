@@ -1,14 +1,49 @@
 import sys
-import csv
+import argparse
+import numpy as np
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QTabWidget, QPushButton, QFileDialog, QLabel,
                              QHBoxLayout, QSpinBox, QSlider, QGroupBox, QFormLayout, 
-                             QDoubleSpinBox, QCheckBox)
-from PySide6.QtCore import Qt
+                             QDoubleSpinBox, QCheckBox, QProgressBar, QMessageBox,
+                             QInputDialog)
+from PySide6.QtCore import Qt, QObject, QThread, QTimer, Signal
 from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
 from PySide6.QtGui import QPen, QColor, QPixmap, QPainter
+import os
+import zipfile
 import xlsxwriter
 from datetime import datetime
+import threading
+from collections import OrderedDict
+from switching_core import (WaveformCache, ResultCache, LoadCancelled, Profiler, profiled,
+                            STORAGE_TYPES, load_waveform, prepare_waveform,
+                            turn_off_params, turn_on_params,
+                            reverse_recovery_params, vgs_transient_params,
+                            iter_events, event_statistics, Deskew, EVENT_FIELDS,
+                            channel_window)
+from switching_stream import DEFAULT_PORT, CsvStreamParser, StreamAnalyzer, source_chunks
+from waveform_view import WaveformView, WaveformSeries
+
+# Minimum plot width in pixels assumed when sizing LOD envelopes
+DEFAULT_PLOT_WIDTH = 800
+
+# Shortest interval between two redraws of the same chart (about 60 fps)
+FRAME_INTERVAL_MS = 16
+
+# Rows converted and streamed to the workbook between progress updates
+EXPORT_CHUNK_ROWS = 65536
+
+# Data rows that fit on a sheet below its header, Excel stops at 1,048,576 rows
+EXCEL_MAX_DATA_ROWS = 1048576 - 1
+
+# Envelope width of decimated export charts, at most about 16k points per series
+EXPORT_CHART_WIDTH = 2000
+
+# Quiet time after a load before the hidden tabs are built, one tab per interval
+IDLE_BUILD_MS = 200
+
+# Envelopes kept by the shared waveform model for reuse across views
+ENVELOPE_CACHE_ENTRIES = 48
 
 class CursorControls(QGroupBox):
     def __init__(self, title, parent=None):
@@ -70,12 +105,422 @@ class AnalysisControls(QGroupBox):
         self.layout.addRow("Low Threshold (%):", self.low_threshold)
         self.layout.addRow(self.auto_calculate)
 
+class LoadWorker(QObject):
+    """Parses a capture off the GUI thread and hands the WaveformStore back."""
+    progress = Signal(float, float, int)
+    finished = Signal(object)
+    failed = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, filename, cache, profiler, storage='float64'):
+        super().__init__()
+        self.filename = filename
+        self.cache = cache
+        self.storage = storage
+        self.profiler = profiler
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        try:
+            with self.profiler.span('load_csv_data', filename=self.filename):
+                waveform = load_waveform(self.filename, self.cache, self.storage,
+                                         progress=self.progress.emit,
+                                         is_cancelled=self._cancel.is_set)
+            # Build the time index and LOD pyramids here rather than on the first redraw,
+            # or reuse the ones saved by an earlier load of the same capture
+            with self.profiler.span('prepare'):
+                prepare_waveform(self.filename, waveform, self.cache, self.storage)
+        except LoadCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            # Anything escaping the thread would leave the load running forever,
+            # and a MemoryError is likeliest on exactly the largest captures
+            self.failed.emit(f"{type(e).__name__}: {e}")
+        else:
+            self.finished.emit(waveform)
+
+
+class StreamWorker(QObject):
+    """Reads a live stream off the GUI thread and emits every triggered, analyzed record."""
+    event_ready = Signal(object)
+    failed = Signal(str)
+    finished = Signal()
+
+    def __init__(self, source, thresholds):
+        super().__init__()
+        self.source = source
+        # (high_pct, low_pct) of the turn-off and turn-on tabs, by analysis
+        self.thresholds = thresholds
+        self.analyzer = StreamAnalyzer(thresholds=thresholds)
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        parser = CsvStreamParser()
+        try:
+            for chunk in source_chunks(self.source, self._cancel.is_set):
+                for result in self.analyzer.feed(parser.feed(chunk)):
+                    # Build the LOD pyramids and integrals here rather than on the redraw
+                    result['waveform'].prepare()
+                    result['thresholds'] = self.thresholds
+                    self.event_ready.emit(result)
+        except Exception as e:
+            # As in LoadWorker, every failure has to reach the GUI thread
+            self.failed.emit(f"{type(e).__name__}: {e}")
+        else:
+            self.finished.emit()
+
+
+class ExportCancelled(Exception):
+    """Raised inside the export worker when the user cancels."""
+
+
+class ExportWorker(QObject):
+    """Streams the workbook to disk off the GUI thread.
+
+    The workbook is opened in constant_memory mode, so each row is flushed
+    as soon as the next one starts and memory stays flat whatever the row
+    count. That mode needs rows in order, so each sheet writes its data and
+    the parameter block beside it row by row, from chunks converted out of
+    NumPy in one go.
+
+    With a sidecar path, each sheet holds only the min/max envelope of its
+    range for the chart, and the full-resolution channels go to a
+    compressed NPZ file next to the workbook.
+    """
+    progress = Signal(int, int)
+    finished = Signal(str)
+    failed = Signal(str)
+    cancelled = Signal()
+
+    def __init__(self, filename, data, sheets, thresholds, sidecar=None, profiler=None):
+        super().__init__()
+        self.filename = filename
+        self.data = data
+        # (sheet_name, start_idx, end_idx, parameter lines) per tab
+        self.sheets = sheets
+        # (high_pct, low_pct) of the turn-off and turn-on tabs, by analysis, for the Events sheet
+        self.thresholds = thresholds
+        self.sidecar = sidecar
+        self.profiler = profiler or Profiler()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        # NaN marks a measurement that found no crossing, write it as #NUM!
+        workbook = xlsxwriter.Workbook(self.filename, {'constant_memory': True,
+                                                       'nan_inf_to_errors': True})
+        try:
+            if self.sidecar is not None:
+                self.export_sidecar()
+            tabs = []
+            for sheet_name, start_idx, end_idx, params in self.sheets:
+                columns, first, count = self.tab_columns(start_idx, end_idx)
+                tabs.append((sheet_name, columns, first, count,
+                             params + self.sidecar_params(start_idx, end_idx)
+                             + self.truncation_params(count)))
+            total_rows = sum(min(count, EXCEL_MAX_DATA_ROWS) for _, _, _, count, _ in tabs)
+            rows_written = 0
+            for sheet_name, columns, first, count, params in tabs:
+                with self.profiler.span(f"export_tab_data ({sheet_name})", rows=count):
+                    for rows in self.export_tab_data(workbook, sheet_name, columns, first, count,
+                                                     params):
+                        rows_written += rows
+                        self.progress.emit(rows_written, total_rows)
+            with self.profiler.span('export_events'):
+                self.export_events(workbook)
+            with self.profiler.span('close workbook'):
+                workbook.close()
+        except ExportCancelled:
+            self.discard(workbook)
+            self.cancelled.emit()
+        except Exception as e:
+            # As in LoadWorker, every failure has to reach the GUI thread
+            self.discard(workbook)
+            self.failed.emit(f"{type(e).__name__}: {e}")
+        else:
+            self.finished.emit(self.filename)
+
+    def discard(self, workbook):
+        """Close the workbook to release its temp files, then remove the partial files."""
+        try:
+            workbook.close()
+        except Exception:
+            # The workbook is being thrown away, only its files matter
+            pass
+        for filename in [self.filename, self.sidecar]:
+            if filename is not None and os.path.exists(filename):
+                try:
+                    os.remove(filename)
+                except OSError:
+                    pass
+
+    def export_sidecar(self):
+        """Write the full-resolution channels and each sheet's sample range to the NPZ sidecar.
+
+        The file is the one np.savez_compressed would write, but each channel
+        is converted and compressed EXPORT_CHUNK_ROWS samples at a time, so
+        lazy channels are never converted whole.
+        """
+        with zipfile.ZipFile(self.sidecar, 'w', zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+            for name in ['time', 'vgs', 'vds', 'is']:
+                values = self.data[name]
+                dtype = np.dtype(values.dtype)
+                with archive.open(f"{name}.npy", 'w', force_zip64=True) as file:
+                    np.lib.format.write_array_header_1_0(file, {
+                        'descr': np.lib.format.dtype_to_descr(dtype),
+                        'fortran_order': False,
+                        'shape': (len(values),)})
+                    for start in range(0, len(values), EXPORT_CHUNK_ROWS):
+                        if self._cancel.is_set():
+                            raise ExportCancelled()
+                        block = values[start:start + EXPORT_CHUNK_ROWS]
+                        file.write(np.asarray(block, dtype=dtype).tobytes())
+            for sheet_name, start_idx, end_idx, _ in self.sheets:
+                with archive.open(f"range {sheet_name}.npy", 'w') as file:
+                    np.lib.format.write_array(file, np.array([start_idx, end_idx]))
+
+    def sidecar_params(self, start_idx, end_idx):
+        """Extra parameter block lines pointing a decimated sheet at its full data."""
+        if self.sidecar is None:
+            return []
+        return ["",
+                f"Full-resolution data: {os.path.basename(self.sidecar)}",
+                f"  Samples: {start_idx} to {end_idx}",
+                "  Chart and table: min/max envelope"]
+
+    def truncation_params(self, rows):
+        """Parameter block lines noting a range cut short at the sheet's last row."""
+        if rows <= EXCEL_MAX_DATA_ROWS:
+            return []
+        return ["",
+                f"Range has {rows:,} samples, the sheet holds the first {EXCEL_MAX_DATA_ROWS:,}",
+                "  Export with the NPZ sidecar option for the full range"]
+
+    def tab_columns(self, start_idx, end_idx):
+        """(columns, first, count): the Time, VGS, VDS and IS rows of a sheet are columns[first:first + count].
+
+        Full-resolution sheets get the channels themselves, which are only
+        sliced chunk by chunk as the rows are written, so a lazy channel is
+        never converted for the whole range at once.
+        """
+        names = ['time', 'vgs', 'vds', 'is']
+        if self.sidecar is None:
+            return [self.data[name] for name in names], start_idx, end_idx - start_idx + 1
+
+        # Every channel buckets the same samples, so one time column serves all envelopes
+        envelopes = [self.data.envelope(name, start_idx, end_idx, EXPORT_CHART_WIDTH)
+                     for name in names[1:]]
+        return [envelopes[0][0]] + [values for _, values in envelopes], 0, len(envelopes[0][0])
+
+    def export_tab_data(self, workbook, sheet_name, columns, first, count, params):
+        """Write one tab's sheet, yielding the number of data rows written per chunk."""
+        worksheet = workbook.add_worksheet(sheet_name)
+        
+        # Get the number of rows with data in the selected range, as many as fit on a sheet
+        num_rows = min(count, EXCEL_MAX_DATA_ROWS)
+        
+        #if (' ' in sheet_name):# add single quote for sheet name with spaces
+        sheet_ref = "\'" + sheet_name + "\'" # add single quote for all sheet names ion formulas / series
+        
+        # Create Excel chart
+        chart = workbook.add_chart({'type': 'line'})
+        
+        # Add voltage series to primary y-axis
+        chart.add_series({
+            'name': 'VGS',
+            'categories': f'={sheet_ref}!$A$2:$A${num_rows+1}',
+            'values': f'={sheet_ref}!$B$2:$B${num_rows+1}',
+            'line': {'color': 'blue', 'width': 1.5},
+            'y_axis': 0,  # Primary axis
+        })
+        
+        chart.add_series({
+            'name': 'VDS',
+            'categories': f'={sheet_ref}!$A$2:$A${num_rows+1}',
+            'values': f'={sheet_ref}!$C$2:$C${num_rows+1}',
+            'line': {'color': 'red', 'width': 1.5},
+            'y_axis': 0,  # Primary axis
+        })
+        
+        # Add current series to secondary y-axis
+        chart.add_series({
+            'name': 'IS',
+            'categories': f'={sheet_ref}!$A$2:$A${num_rows+1}',
+            'values': f'={sheet_ref}!$D$2:$D${num_rows+1}',
+            'line': {'color': 'green', 'width': 1.5},
+            'y2_axis': True,  # Secondary axis
+        })
+        
+        # Configure chart
+        chart.set_title({'name': sheet_name})
+        chart.set_x_axis({
+            'name': 'Time (s)',
+            'major_gridlines': {'visible': True},
+        })
+        
+        # Configure primary y-axis (voltage)
+        chart.set_y_axis({
+            'name': 'Voltage (V)',
+            'major_gridlines': {'visible': True},
+        })
+        
+        # Configure secondary y-axis (current)
+        chart.set_y2_axis({
+            'name': 'Current (A)',
+            'major_gridlines': {'visible': True},
+        })
+        
+        chart.set_legend({'position': 'bottom'})
+        chart.set_size({'width': 720, 'height': 480})
+        
+        # Insert chart into worksheet
+        worksheet.insert_chart('F2', chart)
+
+        # Analysis parameters go in column I from the third row, beside the data
+        param_rows = {2 + offset: line for offset, line in enumerate(params)}
+
+        # Add data headers
+        worksheet.write_row(0, 0, ['Time', 'VGS', 'VDS', 'IS'])
+        
+        # Stream the columns in chunks, rows in order as constant_memory requires
+        for chunk_start in range(0, num_rows, EXPORT_CHUNK_ROWS):
+            if self._cancel.is_set():
+                raise ExportCancelled()
+            chunk_end = min(chunk_start + EXPORT_CHUNK_ROWS, num_rows)
+            block = np.column_stack([values[first + chunk_start:first + chunk_end]
+                                     for values in columns])
+            row = chunk_start + 1
+            for values in block.tolist():
+                worksheet.write_row(row, 0, values)
+                if row in param_rows:
+                    worksheet.write(row, 8, param_rows.pop(row))
+                row += 1
+            yield chunk_end - chunk_start
+
+        # Short ranges end before the parameter block does
+        for row, line in sorted(param_rows.items()):
+            worksheet.write(row, 8, line)
+
+    def export_events(self, workbook):
+        """Write the per-edge table of a multi-pulse capture with summary statistics.
+
+        Edges are analyzed one at a time, as the tab sheets write one chunk
+        at a time, so memory stays flat whatever the capture length.
+        """
+        worksheet = workbook.add_worksheet("Events")
+        rows = []
+        for row in iter_events(self.data, thresholds=self.thresholds):
+            if self._cancel.is_set():
+                raise ExportCancelled()
+            rows.append(row)
+
+        columns = ['event', 'edge', 't_edge'] + EVENT_FIELDS
+        table = [columns] + [[row[column] for column in columns] for row in rows]
+
+        # Summary statistics per edge type to the right of the table
+        summary = []
+        for edge, fields in event_statistics(rows).items():
+            summary.append([f"{edge} statistics"])
+            summary.append(['field', 'count', 'mean', 'std', 'min', 'max'])
+            for field, stats in fields.items():
+                summary.append([field, stats['count'], stats['mean'],
+                                stats['std'], stats['min'], stats['max']])
+            summary.append([])
+
+        # The two blocks share rows, interleave them to keep the rows in order
+        col = len(columns) + 1
+        for row_idx in range(max(len(table), len(summary))):
+            if row_idx < len(table):
+                worksheet.write_row(row_idx, 0, table[row_idx])
+            if row_idx < len(summary):
+                worksheet.write_row(row_idx, col, summary[row_idx])
+
+
+class RenderScheduler(QObject):
+    """Coalesces bursts of redraw requests into at most one redraw per frame.
+
+    Each request replaces any pending one for the same key, so only the
+    latest state is rendered and stale intermediate requests are dropped.
+    """
+
+    def __init__(self, interval_ms=FRAME_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.pending = {}
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.flush)
+
+    def request(self, key, callback):
+        self.pending[key] = callback
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        for callback in pending.values():
+            callback()
+        # Requests that arrived while rendering wait for the next frame
+        if self.pending:
+            self.timer.start()
+
+
+class WaveformModel(QObject):
+    """The loaded capture, shared by every chart view.
+
+    Views hold no samples of their own. Each asks for the envelope of its
+    own range at its own width, and a request matching an earlier one from
+    any view (the turn-off and turn-on tabs usually show the same span)
+    gets the same arrays back, so a painter view references them directly
+    and only QtCharts keeps a converted copy of the few thousand points.
+    """
+    def __init__(self, parent=None, max_entries=ENVELOPE_CACHE_ENTRIES):
+        super().__init__(parent)
+        self.data = None
+        self.max_entries = max_entries
+        self.envelopes = OrderedDict()
+
+    def setData(self, data):
+        self.data = data
+        self.envelopes.clear()
+
+    def envelope(self, channel, start_idx, end_idx, width):
+        """(time, values) of a channel over start_idx..end_idx sized for width pixels."""
+        key = (channel, start_idx, end_idx, width)
+        if key in self.envelopes:
+            self.envelopes.move_to_end(key)
+            return self.envelopes[key]
+        envelope = self.data.envelope(channel, start_idx, end_idx, width)
+        self.envelopes[key] = envelope
+        while len(self.envelopes) > self.max_entries:
+            self.envelopes.popitem(last=False)
+        return envelope
+
 
 class SwitchingAnalysisApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, renderer='charts', profiler=None, storage='float64'):
         super().__init__()
         self.setWindowTitle("Switching Loss Analysis")
         self.setGeometry(100, 100, 1200, 800)
+
+        # 'charts' draws through QtCharts, 'painter' through the QPainter WaveformView
+        self.renderer = renderer
+
+        # Precision loaded captures are held at, one of STORAGE_TYPES
+        self.storage = storage
+
+        # Timing spans, disabled unless a profiler is passed in
+        self.profiler = profiler or Profiler()
+        if self.profiler.enabled:
+            self.statusBar().showMessage("Profiling: timings appear here after a load")
         
         main_widget = QWidget()
         self.setCentralWidget(main_widget)
@@ -89,7 +534,60 @@ class SwitchingAnalysisApp(QMainWindow):
         self.export_button.clicked.connect(self.export_data)
         button_layout.addWidget(self.load_button)
         button_layout.addWidget(self.export_button)
+
+        # Live stream from a scope or a capture file being written
+        self.stream_button = QPushButton("Stream...")
+        self.stream_button.clicked.connect(self.toggle_stream)
+        self.stream_status = QLabel()
+        button_layout.addWidget(self.stream_button)
+        button_layout.addWidget(self.stream_status)
+
+        # Load progress, shown only while a capture is being parsed
+        self.load_progress = QProgressBar()
+        self.load_progress.setRange(0, 1000)
+        self.load_progress.setVisible(False)
+        self.cancel_load_button = QPushButton("Cancel")
+        self.cancel_load_button.setVisible(False)
+        self.cancel_load_button.clicked.connect(self.cancel_load)
+        button_layout.addWidget(self.load_progress)
+        button_layout.addWidget(self.cancel_load_button)
+
+        # Export progress, shown only while a workbook is being written
+        self.export_progress = QProgressBar()
+        self.export_progress.setRange(0, 1000)
+        self.export_progress.setVisible(False)
+        self.cancel_export_button = QPushButton("Cancel Export")
+        self.cancel_export_button.setVisible(False)
+        self.cancel_export_button.clicked.connect(self.cancel_export)
+        self.sidecar_export = QCheckBox("Decimated chart + NPZ sidecar")
+        self.sidecar_export.setToolTip("Write min/max chart data to the workbook and the "
+                                       "full-resolution waveforms to a .npz file beside it")
+        button_layout.addWidget(self.sidecar_export)
+        button_layout.addWidget(self.export_progress)
+        button_layout.addWidget(self.cancel_export_button)
         layout.addLayout(button_layout)
+
+        # Probe deskew, applied to the channels Eon and Eoff are integrated from
+        deskew_group = QGroupBox("Probe Deskew")
+        deskew_layout = QHBoxLayout()
+        self.skew_controls = {}
+        for name, label in [('vds', "VDS delay (ns):"), ('is', "IS delay (ns):")]:
+            skew = QDoubleSpinBox()
+            skew.setRange(-100, 100)
+            skew.setDecimals(2)
+            skew.setSingleStep(0.1)
+            skew.valueChanged.connect(
+                lambda: self.render_scheduler.request('deskew', self.apply_deskew))
+            deskew_layout.addWidget(QLabel(label))
+            deskew_layout.addWidget(skew)
+            self.skew_controls[name] = skew
+        self.resample_uniform = QCheckBox("Resample to uniform time base")
+        self.resample_uniform.stateChanged.connect(
+            lambda: self.render_scheduler.request('deskew', self.apply_deskew))
+        deskew_layout.addWidget(self.resample_uniform)
+        deskew_layout.addStretch()
+        deskew_group.setLayout(deskew_layout)
+        layout.addWidget(deskew_group)
         
         self.tabs = QTabWidget()
         layout.addWidget(self.tabs)
@@ -100,17 +598,35 @@ class SwitchingAnalysisApp(QMainWindow):
         self.reverse_recovery_chart = self.create_chart("Reverse Recovery")
         self.vgs_transient_chart = self.create_chart("VGS Transient")
         
+        # Series are created once per chart and refilled in place on every redraw
+        #transient_channels = [("VGS", QColor("#5B9BD5"), 'vgs'),  # Light blue
+        #                      ("VDS", QColor("#ED7D31"), 'vds'),  # Orange
+        #                      ("IS", QColor("#70AD47"), 'is')]    # Green
+        transient_channels = [("VGS", QColor(Qt.blue), 'vgs'),
+                              ("VDS", QColor(Qt.red), 'vds'),
+                              ("IS", QColor(Qt.green), 'is')]
+        self.chart_series = {
+            self.turn_off_chart: self.add_chart_series(self.turn_off_chart, transient_channels),
+            self.turn_on_chart: self.add_chart_series(self.turn_on_chart, transient_channels),
+            self.reverse_recovery_chart: self.add_chart_series(
+                self.reverse_recovery_chart, [("IRR", QColor(Qt.blue), 'is')]),
+            self.vgs_transient_chart: self.add_chart_series(
+                self.vgs_transient_chart, [("VGS", QColor(Qt.magenta), 'vgs')]),
+        }
+        
         # Create chart views
-        self.turn_off_view = QChartView(self.turn_off_chart)
-        self.turn_on_view = QChartView(self.turn_on_chart)
-        self.reverse_recovery_view = QChartView(self.reverse_recovery_chart)
-        self.vgs_transient_view = QChartView(self.vgs_transient_chart)
+        self.turn_off_view = self.create_view(self.turn_off_chart)
+        self.turn_on_view = self.create_view(self.turn_on_chart)
+        self.reverse_recovery_view = self.create_view(self.reverse_recovery_chart)
+        self.vgs_transient_view = self.create_view(self.vgs_transient_chart)
         
-        # Enable chart interaction
+        # Enable chart interaction, zooming along time so the zoom maps onto the time range controls
         for view in [self.turn_off_view, self.turn_on_view, 
                     self.reverse_recovery_view, self.vgs_transient_view]:
-            view.setRubberBand(QChartView.RubberBand.RectangleRubberBand)
+            view.setRubberBand(QChartView.RubberBand.HorizontalRubberBand)
             view.setInteractive(True)
+            view.chart().axes(Qt.Horizontal)[0].rangeChanged.connect(
+                lambda t_min, t_max, view=view: self.on_time_axis_changed(view, t_min, t_max))
         
         # Create tabs
         self.turn_off_tab = QWidget()
@@ -123,14 +639,75 @@ class SwitchingAnalysisApp(QMainWindow):
         self.turn_on_controls = self.create_tab_controls(self.turn_on_tab, self.turn_on_view, "Turn-on")
         self.reverse_recovery_controls = self.create_tab_controls(self.reverse_recovery_tab, self.reverse_recovery_view, "Reverse Recovery")
         self.vgs_transient_controls = self.create_tab_controls(self.vgs_transient_tab, self.vgs_transient_view, "VGS Transient")
+
+        # Per-view controls and the analysis that annotates it
+        self.view_controls = {
+            self.turn_off_view: self.turn_off_controls,
+            self.turn_on_view: self.turn_on_controls,
+            self.reverse_recovery_view: self.reverse_recovery_controls,
+            self.vgs_transient_view: self.vgs_transient_controls,
+        }
+        self.view_analysis = {
+            self.turn_off_view: (self.calculate_turn_off_params, self.add_turn_off_annotations),
+            self.turn_on_view: (self.calculate_turn_on_params, self.add_turn_on_annotations),
+            self.reverse_recovery_view: (self.calculate_reverse_recovery_params,
+                                         self.add_reverse_recovery_annotations),
+            self.vgs_transient_view: (self.calculate_vgs_transient_params,
+                                      self.add_vgs_transient_annotations),
+        }
         
         # Add tabs
         self.tabs.addTab(self.turn_off_tab, "Turn-off Transient")
         self.tabs.addTab(self.turn_on_tab, "Turn-on Transient")
         self.tabs.addTab(self.reverse_recovery_tab, "Reverse Recovery")
         self.tabs.addTab(self.vgs_transient_tab, "VGS Transient")
-        
-        self.data = None
+
+        # Only the visible tab is built on a load, the others on activation or when idle
+        self.tab_views = {
+            self.turn_off_tab: self.turn_off_view,
+            self.turn_on_tab: self.turn_on_view,
+            self.reverse_recovery_tab: self.reverse_recovery_view,
+            self.vgs_transient_tab: self.vgs_transient_view,
+        }
+        self.view_plots = {
+            self.turn_off_view: self.plot_turn_off_transient,
+            self.turn_on_view: self.plot_turn_on_transient,
+            self.reverse_recovery_view: self.plot_reverse_recovery,
+            self.vgs_transient_view: self.plot_vgs_transient,
+        }
+        self.stale_views = set()
+        self.idle_build_timer = QTimer(self)
+        self.idle_build_timer.setSingleShot(True)
+        self.idle_build_timer.setInterval(IDLE_BUILD_MS)
+        self.idle_build_timer.timeout.connect(self.build_next_stale_view)
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+        
+        # Every view reads the capture through this one model
+        self.model = WaveformModel(self)
+        self.deskew = None
+        self.deskewed = None
+        self.cache = WaveformCache()
+        self.results = ResultCache()
+        self.render_scheduler = RenderScheduler(parent=self)
+        self.annotations = {}
+        self.view_slices = {}
+        self.analysis_ranges = {}
+        self.setting_time_axis = False
+        self.load_thread = None
+        self.load_worker = None
+        self.export_thread = None
+        self.export_worker = None
+        self.stream_thread = None
+        self.stream_worker = None
+        self.stream_result = None
+
+    @property
+    def data(self):
+        return self.model.data
+
+    @data.setter
+    def data(self, data):
+        self.model.setData(data)
 
     def create_tab_controls(self, tab, chart_view, name):
         layout = QVBoxLayout(tab)
@@ -183,10 +760,10 @@ class SwitchingAnalysisApp(QMainWindow):
         apply_range.clicked.connect(lambda: self.apply_time_range(chart_view))
         reset_range.clicked.connect(lambda: self.reset_time_range(chart_view))
         
-        # Connect control signals
-        start_time.valueChanged.connect(lambda: self.apply_time_range(chart_view))
-        end_time.valueChanged.connect(lambda: self.apply_time_range(chart_view))
-        auto_calculate.stateChanged.connect(lambda: self.apply_time_range(chart_view))
+        # Connect control signals, coalescing rapid changes into one redraw per frame
+        start_time.valueChanged.connect(lambda: self.schedule_time_range(chart_view))
+        end_time.valueChanged.connect(lambda: self.schedule_time_range(chart_view))
+        auto_calculate.stateChanged.connect(lambda: self.schedule_time_range(chart_view))
         
         # Add all layouts to time group
         time_layout.addLayout(start_layout)
@@ -216,6 +793,10 @@ class SwitchingAnalysisApp(QMainWindow):
         low_layout.addWidget(low_label)
         low_layout.addWidget(low_threshold)
         
+        # The thresholds drive the analysis only, re-run it without touching the time axis
+        high_threshold.valueChanged.connect(lambda: self.schedule_analysis(chart_view))
+        low_threshold.valueChanged.connect(lambda: self.schedule_analysis(chart_view))
+        
         threshold_layout.addLayout(high_layout)
         threshold_layout.addLayout(low_layout)
         threshold_group.setLayout(threshold_layout)
@@ -259,37 +840,57 @@ class SwitchingAnalysisApp(QMainWindow):
 
             chart = chart_view.chart()
             axis_x = chart.axes(Qt.Horizontal)[0]
-            axis_x.setRange(min(self.data['time']), max(self.data['time']))
-            controls.start_time.setValue(min(self.data['time']))
-            controls.end_time.setValue(max(self.data['time']))
+            axis_x.setRange(self.data.t_start, self.data.t_end)
+            controls.start_time.setValue(self.data.t_start)
+            controls.end_time.setValue(self.data.t_end)
 
     def apply_time_range(self, chart_view):
-        # Get the current tab and its controls
-        current_tab = self.tabs.currentWidget()
+        controls = self.view_controls[chart_view]
+        start_time = controls.start_time.value()
+        end_time = controls.end_time.value()
+        self.set_time_axis(chart_view, start_time, end_time)
         
-        if current_tab == self.turn_off_tab:
-            controls = self.turn_off_controls
-        elif current_tab == self.turn_on_tab:
-            controls = self.turn_on_controls
-        elif current_tab == self.reverse_recovery_tab:
-            controls = self.reverse_recovery_controls
-        elif current_tab == self.vgs_transient_tab:
-            controls = self.vgs_transient_controls
-        else:
+        # Pan and zoom only swap the visible LOD slice, analysis follows its window
+        self.update_plot_range(chart_view, start_time, end_time)
+        self.refresh_analysis(chart_view)
+
+    def set_time_axis(self, chart_view, start_time, end_time):
+        """Set the time axis from code without echoing the change back into the controls."""
+        self.setting_time_axis = True
+        try:
+            chart_view.chart().axes(Qt.Horizontal)[0].setRange(start_time, end_time)
+        finally:
+            self.setting_time_axis = False
+
+    def on_time_axis_changed(self, chart_view, t_min, t_max):
+        """Feed rubber-band and scroll zooms back through the time range controls."""
+        if self.setting_time_axis or not self.data:
             return
+        controls = self.view_controls[chart_view]
+        for spin_box, value in [(controls.start_time, t_min), (controls.end_time, t_max)]:
+            spin_box.blockSignals(True)
+            spin_box.setValue(value)
+            spin_box.blockSignals(False)
+        self.schedule_time_range(chart_view)
 
-        chart = chart_view.chart()
-        axis_x = chart.axes(Qt.Horizontal)[0]
-        axis_x.setRange(controls.start_time.value(), controls.end_time.value())
-        
-        # Update the plot with new range
-        self.update_plot_range(chart_view, controls.start_time.value(), controls.end_time.value())
+    def schedule_time_range(self, chart_view):
+        self.render_scheduler.request(chart_view, lambda: self.apply_time_range(chart_view))
+
+    def schedule_analysis(self, chart_view):
+        # Keyed apart from the time range so neither request replaces the other
+        if chart_view not in self.stale_views:
+            self.render_scheduler.request((chart_view, 'analysis'),
+                                          lambda: self.refresh_analysis(chart_view))
 
     def reset_time_range(self, chart_view):
         if self.data:
             self.set_auto_range(chart_view)
         
     def create_chart(self, title):
+        if self.renderer == 'painter':
+            # WaveformView brings its own dark theme and voltage/current axes
+            return WaveformView(title)
+
         chart = QChart()
         chart.setTitle(title)
         chart.legend().setVisible(True)
@@ -320,374 +921,421 @@ class SwitchingAnalysisApp(QMainWindow):
         return chart
 
 
+    def create_view(self, chart):
+        # A WaveformView is its own chart and view
+        if isinstance(chart, WaveformView):
+            return chart
+        return QChartView(chart)
+
     def create_series(self, name, color):
-        series = QLineSeries()
+        series = WaveformSeries() if self.renderer == 'painter' else QLineSeries()
         series.setName(name)
         pen = QPen(color)
         pen.setWidth(2)
         series.setPen(pen)
         return series
 
+    def add_chart_series(self, chart, channels):
+        """Create and attach one series per (name, color, channel), returning (series, channel) pairs."""
+        result = []
+        for name, color, channel in channels:
+            series = self.create_series(name, color)
+            chart.addSeries(series)
+            series.attachAxis(chart.axes(Qt.Horizontal)[0])
+            # Currents go on the right axis where the chart has one
+            series.attachAxis(chart.axes(Qt.Vertical)[-1 if channel == 'is' else 0])
+            result.append((series, channel))
+        return result
+
+    def plot_width(self, chart_view):
+        """Width in pixels used to pick the LOD level.
+
+        The view width bounds the plot area and, unlike the plot area, does not
+        shift as the axis labels change during a pan or zoom.
+        """
+        return max(chart_view.width(), DEFAULT_PLOT_WIDTH)
+
+    def update_chart_series(self, chart_view, start_idx, end_idx, fit_time=False):
+        """Swap each series of a chart to the envelope of its channel in one replace."""
+        chart = chart_view.chart()
+        width = self.plot_width(chart_view)
+        ranges = {}
+        for series, channel in self.chart_series[chart]:
+            x, y = self.model.envelope(channel, start_idx, end_idx, width)
+            series.replaceNp(x, y)
+            if len(y):
+                axis = [axis for axis in series.attachedAxes() if axis.orientation() == Qt.Vertical][0]
+                low, high = ranges.get(axis, (y.min(), y.max()))
+                ranges[axis] = (min(low, y.min()), max(high, y.max()))
+
+        # Series keep their axes between redraws, so rescale them explicitly
+        for axis, (low, high) in ranges.items():
+            axis.setRange(float(low), float(high))
+        if fit_time and end_idx > start_idx:
+            self.set_time_axis(chart_view, float(self.data['time'][start_idx]),
+                               float(self.data['time'][end_idx]))
+        self.view_slices[chart_view] = (self.data.fingerprint, start_idx, end_idx, width)
+
     def load_data(self):
-        filename, _ = QFileDialog.getOpenFileName(self, "Load Data", "", "CSV Files (*.csv)")
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Load Data", "",
+            "Captures (*.csv *.bin);;CSV Files (*.csv);;Binary Captures (*.bin)")
         if filename:
-            self.load_csv_data(filename)
-            self.process_and_plot_data()
+            self.start_background_load(filename)
+
+    def start_background_load(self, filename):
+        if self.load_thread is not None:
+            return
+
+        self.load_thread = QThread(self)
+        self.load_worker = LoadWorker(filename, self.cache, self.profiler, self.storage)
+        self.load_worker.moveToThread(self.load_thread)
+
+        self.load_thread.started.connect(self.load_worker.run)
+        self.load_worker.progress.connect(self.update_load_progress)
+        self.load_worker.finished.connect(self.on_load_finished)
+        self.load_worker.failed.connect(self.on_load_failed)
+        self.load_worker.cancelled.connect(self.on_load_cancelled)
+
+        self.load_button.setEnabled(False)
+        self.load_progress.setValue(0)
+        self.load_progress.setFormat("Loading...")
+        self.load_progress.setVisible(True)
+        self.cancel_load_button.setVisible(True)
+        self.load_thread.start()
+
+    def cancel_load(self):
+        if self.load_worker is not None:
+            self.load_worker.cancel()
+
+    def update_load_progress(self, bytes_read, total_bytes, rows):
+        if total_bytes > 0:
+            self.load_progress.setValue(int(1000 * bytes_read / total_bytes))
+        self.load_progress.setFormat(
+            f"{bytes_read / 1024**2:.0f} / {total_bytes / 1024**2:.0f} MB, {rows:,} rows")
+
+    def on_load_finished(self, waveform):
+        self.finish_background_load()
+        # Results of the previous capture can never apply to a new load
+        self.results.clear()
+        self.data = waveform
+        self.process_and_plot_data()
+
+    def on_load_failed(self, message):
+        self.finish_background_load()
+        QMessageBox.warning(self, "Load Data", f"Could not load capture:\n{message}")
+
+    def on_load_cancelled(self):
+        self.finish_background_load()
+
+    def finish_background_load(self):
+        self.load_thread.quit()
+        self.load_thread.wait()
+        self.load_worker.deleteLater()
+        self.load_thread.deleteLater()
+        self.load_thread = None
+        self.load_worker = None
+
+        self.load_button.setEnabled(True)
+        self.load_progress.setVisible(False)
+        self.cancel_load_button.setVisible(False)
+
+    def toggle_stream(self):
+        if self.stream_thread is not None:
+            self.stream_worker.cancel()
+            return
+        source, ok = QInputDialog.getText(self, "Stream",
+                                          "Scope host:port, or a capture CSV being written:",
+                                          text=f"localhost:{DEFAULT_PORT}")
+        if ok and source:
+            self.start_stream(source)
+
+    def analysis_thresholds(self):
+        """(high_pct, low_pct) of the turn-off and turn-on tabs, keyed by analysis."""
+        return {analysis: (controls.high_threshold.value(), controls.low_threshold.value())
+                for analysis, controls in [('turn_off', self.turn_off_controls),
+                                           ('turn_on', self.turn_on_controls)]}
 
+    def start_stream(self, source):
+        self.stream_thread = QThread(self)
+        self.stream_worker = StreamWorker(source, self.analysis_thresholds())
+        self.stream_worker.moveToThread(self.stream_thread)
+
+        self.stream_thread.started.connect(self.stream_worker.run)
+        self.stream_worker.event_ready.connect(self.on_stream_event)
+        self.stream_worker.failed.connect(self.on_stream_failed)
+        self.stream_worker.finished.connect(self.finish_stream)
+
+        self.load_button.setEnabled(False)
+        self.stream_button.setText("Stop Stream")
+        self.stream_status.setText(f"Waiting for trigger on {source}")
+        self.stream_thread.start()
+
+    def on_stream_event(self, result):
+        # Records can arrive faster than the charts redraw, only the latest one is shown
+        self.stream_result = result
+        analysis = result['analysis']
+        self.stream_status.setText(
+            f"Event {result['event']}: Eon {analysis['turn_on']['e_on']:.2e} J, "
+            f"Eoff {analysis['turn_off']['e_off']:.2e} J")
+        self.render_scheduler.request('stream', self.show_stream_event)
+
+    def show_stream_event(self):
+        self.data = self.stream_result['waveform']
+        self.seed_results(self.stream_result['analysis'], self.stream_result['thresholds'])
+        self.process_and_plot_data()
+
+    def seed_results(self, analysis, thresholds):
+        """Enter a worker's whole-record results under the keys the tabs look them up by.
+
+        The tabs then annotate from them without re-running the analyses on
+        the GUI thread. A tab whose range or thresholds no longer match what
+        the worker used computes its own as usual.
+        """
+        last = len(self.data) - 1
+        fingerprint = self.data.fingerprint
+        for name, controls in [('turn_off', self.turn_off_controls),
+                               ('turn_on', self.turn_on_controls)]:
+            high, low = thresholds[name]
+            if (self.get_analysis_range(controls) == (0, last)
+                    and controls.high_threshold.value() == high
+                    and controls.low_threshold.value() == low):
+                self.results.put((fingerprint, 0, last, high, low, name), analysis[name])
+        for name in ['reverse_recovery', 'vgs_transient']:
+            self.results.put((fingerprint, 0, last, None, None, name), analysis[name])
+
+    def on_stream_failed(self, message):
+        self.finish_stream()
+        QMessageBox.warning(self, "Stream", f"Stream stopped:\n{message}")
+
+    def finish_stream(self):
+        events, dropped = self.stream_worker.analyzer.events, self.stream_worker.analyzer.dropped
+        self.stream_thread.quit()
+        self.stream_thread.wait()
+        self.stream_worker.deleteLater()
+        self.stream_thread.deleteLater()
+        self.stream_thread = None
+        self.stream_worker = None
+
+        self.load_button.setEnabled(True)
+        self.stream_button.setText("Stream...")
+        self.stream_status.setText(f"Stream ended: {events} events, {dropped} dropped")
+
+    @profiled
     def load_csv_data(self, filename):
-        self.data = {
-            'time': [], 'vgs': [], 'vds': [], 'is': []
-        }
-        
-        with open(filename, 'r') as file:
-            csv_reader = csv.DictReader(file)
-            for row in csv_reader:
-                self.data['time'].append(float(row['Time']))
-                self.data['vgs'].append(float(row['Vgs']))
-                self.data['vds'].append(float(row['Vds']))
-                self.data['is'].append(float(row['Is']))
+        self.results.clear()
+        self.data = load_waveform(filename, self.cache, self.storage)
 
     def process_and_plot_data(self):
         if not self.data:
             return
         
         self.clear_charts()
-        self.plot_turn_off_transient()
-        self.plot_turn_on_transient()
-        self.plot_reverse_recovery()
-        self.plot_vgs_transient()
+        self.stale_views = set(self.view_plots)
+        self.build_view(self.tab_views[self.tabs.currentWidget()])
+        # Restarted by every load, so a fast stream never builds the hidden tabs
+        self.idle_build_timer.start()
+        self.show_timings()
+
+    def build_view(self, chart_view):
+        """Plot and analyze one tab now, clearing its stale mark."""
+        self.stale_views.discard(chart_view)
+        self.view_plots[chart_view]()
+
+    def on_tab_changed(self, index):
+        chart_view = self.tab_views.get(self.tabs.widget(index))
+        if chart_view in self.stale_views and self.data:
+            self.build_view(chart_view)
+            self.show_timings()
+
+    def build_next_stale_view(self):
+        """Build one hidden stale tab, in tab order, and come back for the next."""
+        if not self.data:
+            return
+        for index in range(self.tabs.count()):
+            chart_view = self.tab_views[self.tabs.widget(index)]
+            if chart_view in self.stale_views:
+                self.build_view(chart_view)
+                break
+        if self.stale_views:
+            self.idle_build_timer.start()
 
     def clear_charts(self):
         for chart in [self.turn_off_chart, self.turn_on_chart, 
                      self.reverse_recovery_chart, self.vgs_transient_chart]:
-            chart.removeAllSeries()
+            for series, _ in self.chart_series[chart]:
+                series.clear()
+        self.view_slices.clear()
+        self.analysis_ranges.clear()
 
+    @profiled
     def plot_turn_off_transient(self):
         start_idx, end_idx = self.get_analysis_range(self.turn_off_controls)
-        #vgs_series = self.create_series("VGS", QColor("#5B9BD5"))  # Light blue
-        #vds_series = self.create_series("VDS", QColor("#ED7D31"))  # Orange
-        #is_series = self.create_series("IS", QColor("#70AD47"))    # Green
-        vgs_series = self.create_series("VGS", QColor(Qt.blue))
-        vds_series = self.create_series("VDS", QColor(Qt.red))
-        is_series = self.create_series("IS", QColor(Qt.green))
-        
-        for i in range(start_idx, end_idx + 1):
-            vgs_series.append(self.data['time'][i], self.data['vgs'][i])
-            vds_series.append(self.data['time'][i], self.data['vds'][i])
-            is_series.append(self.data['time'][i], self.data['is'][i])
-        
-        self.turn_off_chart.addSeries(vgs_series)
-        self.turn_off_chart.addSeries(vds_series)
-        self.turn_off_chart.addSeries(is_series)
-        
-        for series in [vgs_series, vds_series, is_series]:
-            series.attachAxis(self.turn_off_chart.axes()[0])
-            series.attachAxis(self.turn_off_chart.axes()[1])
-        
-        params = self.calculate_turn_off_params()
-        self.add_turn_off_annotations(params)
+        self.update_chart_series(self.turn_off_view, start_idx, end_idx, fit_time=True)
+        self.refresh_analysis(self.turn_off_view, force=True)
 
+    @profiled
     def plot_turn_on_transient(self):
         start_idx, end_idx = self.get_analysis_range(self.turn_on_controls)
-        #vgs_series = self.create_series("VGS", QColor("#5B9BD5"))  # Light blue
-        #vds_series = self.create_series("VDS", QColor("#ED7D31"))  # Orange
-        #is_series = self.create_series("IS", QColor("#70AD47"))    # Green
-        vgs_series = self.create_series("VGS", QColor(Qt.blue))
-        vds_series = self.create_series("VDS", QColor(Qt.red))
-        is_series = self.create_series("IS", QColor(Qt.green))
-        
-        for i in range(start_idx, end_idx + 1):
-            vgs_series.append(self.data['time'][i], self.data['vgs'][i])
-            vds_series.append(self.data['time'][i], self.data['vds'][i])
-            is_series.append(self.data['time'][i], self.data['is'][i])
-        
-        self.turn_on_chart.addSeries(vgs_series)
-        self.turn_on_chart.addSeries(vds_series)
-        self.turn_on_chart.addSeries(is_series)
-        
-        for series in [vgs_series, vds_series, is_series]:
-            series.attachAxis(self.turn_on_chart.axes()[0])
-            series.attachAxis(self.turn_on_chart.axes()[1])
-        
-        params = self.calculate_turn_on_params()
-        self.add_turn_on_annotations(params)
+        self.update_chart_series(self.turn_on_view, start_idx, end_idx, fit_time=True)
+        self.refresh_analysis(self.turn_on_view, force=True)
     
+    @profiled
     def plot_reverse_recovery(self):
         start_idx, end_idx = self.get_analysis_range(self.reverse_recovery_controls)
-        #current_series = self.create_series("IRR", QColor("#5B9BD5"))  # Light blue
-        current_series = self.create_series("IRR", QColor(Qt.blue))
-        
-        for i in range(start_idx, end_idx + 1):
-            current_series.append(self.data['time'][i], self.data['is'][i])
-        
-        self.reverse_recovery_chart.addSeries(current_series)
-        current_series.attachAxis(self.reverse_recovery_chart.axes()[0])
-        current_series.attachAxis(self.reverse_recovery_chart.axes()[1])
-        
-        params = self.calculate_reverse_recovery_params()
-        self.add_reverse_recovery_annotations(params)
+        self.update_chart_series(self.reverse_recovery_view, start_idx, end_idx, fit_time=True)
+        self.refresh_analysis(self.reverse_recovery_view, force=True)
 
+    @profiled
     def plot_vgs_transient(self):
         start_idx, end_idx = self.get_analysis_range(self.vgs_transient_controls)
-        #vgs_series = self.create_series("VGS", QColor("#C586C0"))  # Light purple
-        vgs_series = self.create_series("VGS", QColor(Qt.magenta))
-        
-        for i in range(start_idx, end_idx + 1):
-            vgs_series.append(self.data['time'][i], self.data['vgs'][i])
-        
-        self.vgs_transient_chart.addSeries(vgs_series)
-        vgs_series.attachAxis(self.vgs_transient_chart.axes()[0])
-        vgs_series.attachAxis(self.vgs_transient_chart.axes()[1])
-        
-        params = self.calculate_vgs_transient_params()
-        self.add_vgs_transient_annotations(params)
+        self.update_chart_series(self.vgs_transient_view, start_idx, end_idx, fit_time=True)
+        self.refresh_analysis(self.vgs_transient_view, force=True)
+
+    def show_timings(self):
+        """Show the last span timings in the status bar while profiling."""
+        if self.profiler.enabled:
+            self.statusBar().showMessage(self.profiler.summary())
+
+    def refresh_analysis(self, chart_view, force=False):
+        """Re-run a view's analysis and annotations only when its window or thresholds changed."""
+        if not self.data:
+            return
+        controls = self.view_controls[chart_view]
+        window = (self.get_analysis_range(controls),
+                  controls.high_threshold.value(), controls.low_threshold.value())
+        if not force and self.analysis_ranges.get(chart_view) == window:
+            return
+        self.analysis_ranges[chart_view] = window
+        calculate, annotate = self.view_analysis[chart_view]
+        annotate(calculate())
 
+    def analysis_window(self, controls, data=None):
+        """Return the time, vgs, vds and is arrays inside the tab's analysis range.
+
+        They come from data when given, such as the deskewed capture, else from the capture.
+        """
+        data = data or self.data
+        start_idx, end_idx = self.get_analysis_range(controls)
+        # Views or lazy windows, the analyses upcast them a block at a time
+        return [channel_window(data[name], start_idx, end_idx + 1)
+                for name in ['time', 'vgs', 'vds', 'is']]
+
+    def cached_params(self, analysis, controls, compute, data=None):
+        """Return an analysis result, reusing it while data, range and thresholds are unchanged."""
+        start_idx, end_idx = self.get_analysis_range(controls)
+        key = ((data or self.data).fingerprint, start_idx, end_idx,
+               controls.high_threshold.value(), controls.low_threshold.value(), analysis)
+        return self.results.get(key, compute)
+
+    @profiled
     def calculate_turn_off_params(self):
-        vgs_max = max(self.data['vgs'])
-        vds_max = max(self.data['vds'])
-        is_max = max(self.data['is'])
-        
-        return {
-            'vgs_90': vgs_max * 0.9,
-            'vds_10': vds_max * 0.1,
-            'is_10': is_max * 0.1,
-            't_off': self.find_fall_time(self.data['vgs'], 0.9, 0.1),
-            'td_off': self.find_delay_time(self.data['vds'], 0.4, 0.6),
-            'dv_dt_off': self.calculate_slope(self.data['vds']),
-            'di_dt_off': self.calculate_slope(self.data['is']),
-            'e_off': self.calculate_energy(self.data['vds'], self.data['is'])
-        }
+        controls = self.turn_off_controls
+        # The edges bound the Eoff window, so they are measured after probe deskew as well
+        data = self.corrected_data()
 
+        def compute():
+            time, vgs, vds, Is = self.analysis_window(controls, data)
+            params = turn_off_params(time, vgs, vds, Is, controls.high_threshold.value(),
+                                     controls.low_threshold.value())
+            params['e_off'] = self.calculate_energy(*params['e_off_window'], data)
+            return params
+
+        # The corrected data's fingerprint carries the skews and resampling into the key
+        return self.cached_params('turn_off', controls, compute, data)
+
+    @profiled
     def calculate_turn_on_params(self):
-        vgs_max = max(self.data['vgs'])
-        vds_max = max(self.data['vds'])
-        is_max = max(self.data['is'])
-        
-        return {
-            'vgs_10': vgs_max * 0.1,
-            'vds_90': vds_max * 0.9,
-            'is_90': is_max * 0.9,
-            't_on': self.find_rise_time(self.data['vgs'], 0.1, 0.9),
-            'td_on': self.find_delay_time(self.data['vds'], 0.6, 0.4),
-            'dv_dt_on': self.calculate_slope(self.data['vds']),
-            'di_dt_on': self.calculate_slope(self.data['is']),
-            'e_on': self.calculate_energy(self.data['vds'], self.data['is'])
-        }
+        controls = self.turn_on_controls
+        data = self.corrected_data()
+
+        def compute():
+            time, vgs, vds, Is = self.analysis_window(controls, data)
+            params = turn_on_params(time, vgs, vds, Is, controls.high_threshold.value(),
+                                    controls.low_threshold.value())
+            params['e_on'] = self.calculate_energy(*params['e_on_window'], data)
+            return params
+
+        return self.cached_params('turn_on', controls, compute, data)
 
-    def find_fall_time(self, data, high, low):
-        # Implementation for fall time calculation
-        return 1e-6  # placeholder
+    def calculate_energy(self, t1, t2, data=None):
+        """Switching energy as the integral of VDS * IS from t1 to t2, after probe deskew."""
+        return (data or self.corrected_data()).integral('power').between(t1, t2)
 
-    def find_rise_time(self, data, low, high):
-        # Implementation for rise time calculation
-        return 1e-6  # placeholder
+    def skews(self):
+        """Probe delay of each deskewed channel in seconds, omitting zeros."""
+        return {name: control.value() * 1e-9 for name, control in self.skew_controls.items()
+                if control.value()}
 
-    def find_delay_time(self, data, start, end):
-        # Implementation for delay time calculation
-        return 1e-6  # placeholder
+    def corrected_data(self):
+        """The capture with the probe deskew applied, or the capture itself without one.
 
-    def calculate_slope(self, data):
-        # Implementation for slope calculation
-        return 1e6  # placeholder
+        The corrected channels are shifted lazily, only over the windows the
+        turn-on and turn-off analyses read, so changing a skew copies nothing
+        and re-runs only those two analyses.
+        """
+        skews = self.skews()
+        resample = self.resample_uniform.isChecked()
+        if not skews and not resample:
+            return self.data
 
-    def calculate_energy(self, vds, Is):
-        # Implementation for energy calculation
-        return 1e-3  # placeholder
+        key = (self.data.fingerprint, resample)
+        if self.deskew is None or self.deskew[0] != key:
+            self.deskew = (key, Deskew(self.data, resample))
+            self.deskewed = None
+        if self.deskewed is None or self.deskewed[0] != skews:
+            self.deskewed = (skews, self.deskew[1].corrected(skews))
+        return self.deskewed[1]
+
+    def apply_deskew(self):
+        """Re-run the turn-off and turn-on analyses of the built tabs for the current probe deskew."""
+        if not self.data:
+            return
+        for chart_view in [self.turn_off_view, self.turn_on_view]:
+            if chart_view not in self.stale_views:
+                self.refresh_analysis(chart_view, force=True)
+        self.show_timings()
         
+    @profiled
     def calculate_reverse_recovery_params(self):
-        # Find IF (forward current)
-        If = max(self.data['is'])
-        # Find Irrm (peak reverse recovery current) 
-        Irrm = min(self.data['is'])
-        
-        # Calculate di/dt between 60% and 40% points
-        If_Irrm_diff = If - Irrm
-        sixty_percent = If - (0.6 * If_Irrm_diff)
-        forty_percent = If - (0.4 * If_Irrm_diff)
-        
-        # Find corresponding times
-        t60 = self.find_time_at_value(self.data['is'], sixty_percent)
-        t40 = self.find_time_at_value(self.data['is'], forty_percent)
-        
-        di_dt = (sixty_percent - forty_percent)/(t60 - t40)
-        
-        # Find trr (reverse recovery time)
-        t1 = self.find_time_at_value(self.data['is'], 0, 'falling')
-        t2 = self.find_time_at_value(self.data['is'], 0, 'rising')
-        trr = t2 - t1
-        
-        # Calculate tf and ts components
-        tf = t1 - self.find_time_at_value(self.data['is'], If)
-        ts = t2 - t1
-        
-        # Calculate Qrr (reverse recovery charge)
-        Qrr = self.calculate_area_under_curve(
-            self.data['time'], 
-            self.data['is'],
-            t1,
-            t2
-        )
-        
-        return {
-            'If': If,
-            'Irrm': Irrm,
-            'di_dt': di_dt,
-            'trr': trr,
-            'tf': tf,
-            'ts': ts,
-            'Qrr': Qrr
-        }
+        # Reverse recovery and VGS transient cover the whole record, whatever the tab range
+        key = (self.data.fingerprint, 0, len(self.data) - 1, None, None, 'reverse_recovery')
+        return self.results.get(key, lambda: reverse_recovery_params(
+            self.data['time'], self.data['is'], self.data.integral('is')))
 
+    @profiled
     def calculate_vgs_transient_params(self):
-        if not self.data or not self.data['vgs']:
+        if not self.data:
             return {'vgs_static': 0, 'vgs_dynamic': 0}
-
-        # Window size for moving average (adjust based on your sampling rate)
-        window_size = min(50, len(self.data['vgs']) // 10)
-        
-        # Calculate moving average to find steady-state levels
-        moving_avg = self.calculate_moving_average(self.data['vgs'], window_size)
-        
-        # Find steady state high and low levels (static)
-        static_high = self.find_steady_state_level(moving_avg, 'high')
-        static_low = self.find_steady_state_level(moving_avg, 'low')
-        vgs_static = static_high - static_low
-        
-        # Find absolute peak values (dynamic)
-        dynamic_high = max(self.data['vgs'])
-        dynamic_low = min(self.data['vgs'])
-        vgs_dynamic = dynamic_high - dynamic_low
-        
-        return {
-            'vgs_static': vgs_static,
-            'vgs_dynamic': vgs_dynamic,
-            'static_high': static_high,
-            'static_low': static_low,
-            'dynamic_high': dynamic_high,
-            'dynamic_low': dynamic_low
-        }
-
-    def calculate_moving_average(self, data, window_size):
-        """Calculate moving average of the signal."""
-        moving_avg = []
-        for i in range(len(data)):
-            start_idx = max(0, i - window_size // 2)
-            end_idx = min(len(data), i + window_size // 2)
-            window = data[start_idx:end_idx]
-            moving_avg.append(sum(window) / len(window))
-        return moving_avg
-
-    def find_steady_state_level(self, data, level_type='high'):
-        """Find the most common steady-state level using histogram analysis."""
-        if not data:
-            return 0
-            
-        # Calculate min and max for bin ranges
-        min_val = min(data)
-        max_val = max(data)
-        
-        # Create 100 bins
-        num_bins = 100
-        bin_width = (max_val - min_val) / num_bins
-        bins = [min_val + i * bin_width for i in range(num_bins + 1)]
-        
-        # Initialize histogram counts
-        hist_counts = [0] * num_bins
-        
-        # Count values in each bin
-        for value in data:
-            bin_index = min(int((value - min_val) // bin_width), num_bins - 1)
-            hist_counts[bin_index] += 1
-        
-        # Calculate bin centers
-        bin_centers = [(bins[i] + bins[i + 1]) / 2 for i in range(num_bins)]
-        
-        # Calculate mean of data
-        data_mean = sum(data) / len(data)
-        
-        if level_type == 'high':
-            # Find the highest voltage that occurs frequently
-            max_count = 0
-            max_bin_value = 0
-            for i in range(num_bins):
-                if bin_centers[i] > data_mean:
-                    if hist_counts[i] > max_count:
-                        max_count = hist_counts[i]
-                        max_bin_value = bin_centers[i]
-            return max_bin_value
-        else:
-            # Find the lowest voltage that occurs frequently
-            max_count = 0
-            min_bin_value = 0
-            for i in range(num_bins):
-                if bin_centers[i] < data_mean:
-                    if hist_counts[i] > max_count:
-                        max_count = hist_counts[i]
-                        min_bin_value = bin_centers[i]
-            return min_bin_value
-        
-        return 0
-
-    def find_time_at_value(self, data, target, direction='falling'):
-        for i in range(len(data)-1):
-            if direction == 'falling':
-                if data[i] >= target >= data[i+1]:
-                    return self.data['time'][i]
-            else:
-                if data[i] <= target <= data[i+1]:
-                    return self.data['time'][i]
-        return 0
-
-    def calculate_area_under_curve(self, time, data, t1, t2):
-        area = 0
-        for i in range(len(time)-1):
-            if t1 <= time[i] <= t2:
-                dt = time[i+1] - time[i]
-                avg_height = (data[i] + data[i+1])/2
-                area += avg_height * dt
-        return abs(area)
+        key = (self.data.fingerprint, 0, len(self.data) - 1, None, None, 'vgs_transient')
+        return self.results.get(key, lambda: vgs_transient_params(self.data['vgs'],
+                                                                  self.data.pyramids.get('vgs')))
 
     def add_turn_off_annotations(self, params):
-        text = (f"90% VGS: {params['vgs_90']:.2f}V\n"
+        text = (f"{params['high_pct']}% VGS: {params['vgs_90']:.2f}V\n"
                 f"toff: {params['t_off']:.2e}s\n"
                 f"td(off): {params['td_off']:.2e}s\n"
                 f"dV/dt_off: {params['dv_dt_off']:.2e}V/s\n"
                 f"dI/dt_off: {params['di_dt_off']:.2e}A/s\n"
-                f"10% VDS: {params['vds_10']:.2f}V\n"
-                f"10% IS: {params['is_10']:.2f}A\n"
+                f"{params['low_pct']}% VDS: {params['vds_10']:.2f}V\n"
+                f"{params['low_pct']}% IS: {params['is_10']:.2f}A\n"
                 f"Eoff: {params['e_off']:.2e}J")
-        
-        label = QLabel(text)
-        #label.setStyleSheet("background-color: white; padding: 5px; border: 1px solid black")
-        label.setStyleSheet("""
-            background-color: #2B2B2B;
-            color: #FFFFFF;
-            padding: 5px;
-            border: 1px solid #808080;
-            border-radius: 3px;
-        """)
-        self.turn_off_chart.scene().addWidget(label)
+
+        self.set_annotation(self.turn_off_chart, text)
+        self.set_cursors(self.turn_off_chart, params['e_off_window'])
 
     def add_turn_on_annotations(self, params):
-        text = (f"10% VGS: {params['vgs_10']:.2f}V\n"
+        text = (f"{params['low_pct']}% VGS: {params['vgs_10']:.2f}V\n"
                 f"ton: {params['t_on']:.2e}s\n"
                 f"td(on): {params['td_on']:.2e}s\n"
                 f"dV/dt_on: {params['dv_dt_on']:.2e}V/s\n"
                 f"dI/dt_on: {params['di_dt_on']:.2e}A/s\n"
-                f"90% VDS: {params['vds_90']:.2f}V\n"
-                f"90% IS: {params['is_90']:.2f}A\n"
+                f"{params['high_pct']}% VDS: {params['vds_90']:.2f}V\n"
+                f"{params['high_pct']}% IS: {params['is_90']:.2f}A\n"
                 f"Eon: {params['e_on']:.2e}J")
-        
-        label = QLabel(text)
-        #label.setStyleSheet("background-color: white; padding: 5px; border: 1px solid black")
-        label.setStyleSheet("""
-            background-color: #2B2B2B;
-            color: #FFFFFF;
-            padding: 5px;
-            border: 1px solid #808080;
-            border-radius: 3px;
-        """)
-        self.turn_on_chart.scene().addWidget(label)
+
+        self.set_annotation(self.turn_on_chart, text)
+        self.set_cursors(self.turn_on_chart, params['e_on_window'])
         
     def add_reverse_recovery_annotations(self, params):
         text = (f"IF: {params['If']:.2f}A\n"
@@ -697,17 +1345,8 @@ class SwitchingAnalysisApp(QMainWindow):
                 f"tf: {params['tf']:.2e}s\n"
                 f"ts: {params['ts']:.2e}s\n"
                 f"Qrr: {params['Qrr']:.2e}C")
-        
-        label = QLabel(text)
-        #label.setStyleSheet("background-color: white; padding: 5px; border: 1px solid black")
-        label.setStyleSheet("""
-            background-color: #2B2B2B;
-            color: #FFFFFF;
-            padding: 5px;
-            border: 1px solid #808080;
-            border-radius: 3px;
-        """)
-        self.reverse_recovery_chart.scene().addWidget(label)
+
+        self.set_annotation(self.reverse_recovery_chart, text)
 
     def add_vgs_transient_annotations(self, params):
         text = (f"VGS-static: {params['vgs_static']:.2f}V\n"
@@ -716,17 +1355,35 @@ class SwitchingAnalysisApp(QMainWindow):
                 f"VGS-dynamic: {params['vgs_dynamic']:.2f}V\n"
                 f"  Peak High: {params['dynamic_high']:.2f}V\n"
                 f"  Peak Low: {params['dynamic_low']:.2f}V")
+
+        self.set_annotation(self.vgs_transient_chart, text)
         
-        label = QLabel(text)
-        label.setStyleSheet("""
-            background-color: #2B2B2B;
-            color: #FFFFFF;
-            padding: 5px;
-            border: 1px solid #808080;
-            border-radius: 3px;
-        """)
-        self.vgs_transient_chart.scene().addWidget(label)
-        
+    def set_annotation(self, chart, text):
+        """Show text in the chart's parameter label, reusing the label across redraws."""
+        if isinstance(chart, WaveformView):
+            chart.setAnnotation(text)
+            return
+        label = self.annotations.get(chart)
+        if label is None:
+            label = QLabel()
+            #label.setStyleSheet("background-color: white; padding: 5px; border: 1px solid black")
+            label.setStyleSheet("""
+                background-color: #2B2B2B;
+                color: #FFFFFF;
+                padding: 5px;
+                border: 1px solid #808080;
+                border-radius: 3px;
+            """)
+            chart.scene().addWidget(label)
+            self.annotations[chart] = label
+        label.setText(text)
+        label.adjustSize()
+
+    def set_cursors(self, chart, times):
+        """Mark times, such as an energy integration window, with cursors where supported."""
+        if isinstance(chart, WaveformView):
+            chart.setCursors(times)
+
     def update_analysis(self):
         """Update the analysis based on control values"""
         if not self.data:
@@ -748,79 +1405,32 @@ class SwitchingAnalysisApp(QMainWindow):
         elif current_tab == self.vgs_transient_tab:
             controls = self.vgs_transient_controls
             self.plot_vgs_transient()
+        self.show_timings()
 
     def get_analysis_range(self, controls):
         """Get the data range based on control settings"""
-        if not self.data or not self.data['time']:
+        if not self.data:
             return 0, 0
             
         if controls.auto_calculate.isChecked():
             return 0, len(self.data['time']) - 1
             
-        start_time = controls.start_time.value()
-        end_time = controls.end_time.value()
-        
-        # Find corresponding indices
-        start_idx = 0
-        end_idx = len(self.data['time']) - 1
-        
-        # Find start index
-        for i, t in enumerate(self.data['time']):
-            if t >= start_time:
-                start_idx = i
-                break
-                
-        # Find end index
-        for i in range(start_idx, len(self.data['time'])):
-            if self.data['time'][i] >= end_time:
-                end_idx = i
-                break
-        
-        # Ensure end_idx is not less than start_idx
-        end_idx = max(end_idx, start_idx)
-        
-        return start_idx, end_idx
+        return self.data.time_index.index_range(controls.start_time.value(),
+                                                controls.end_time.value())
         
     def update_plot_range(self, chart_view, start_time, end_time):
         if not self.data:
             return
             
-        # Find corresponding indices
-        start_idx = 0
-        end_idx = len(self.data['time']) - 1
+        start_idx, end_idx = self.data.time_index.index_range(start_time, end_time)
         
-        for i, t in enumerate(self.data['time']):
-            if t >= start_time:
-                start_idx = i
-                break
-                
-        for i, t in enumerate(self.data['time'][start_idx:], start_idx):
-            if t >= end_time:
-                end_idx = i
-                break
-        
-        # Update chart with new range
-        chart = chart_view.chart()
-        chart.removeAllSeries()
-        
-        # Create and add new series with range-limited data
-        vgs_series = self.create_series("VGS", QColor(Qt.blue))
-        vds_series = self.create_series("VDS", QColor(Qt.red))
-        is_series = self.create_series("IS", QColor(Qt.green))
-        
-        for i in range(start_idx, end_idx + 1):
-            vgs_series.append(self.data['time'][i], self.data['vgs'][i])
-            vds_series.append(self.data['time'][i], self.data['vds'][i])
-            is_series.append(self.data['time'][i], self.data['is'][i])
-        
-        chart.addSeries(vgs_series)
-        chart.addSeries(vds_series)
-        chart.addSeries(is_series)
-        
-        # Attach axes
-        for series in [vgs_series, vds_series, is_series]:
-            series.attachAxis(chart.axes()[0])
-            series.attachAxis(chart.axes()[1])
+        # Same slice at the same width needs nothing beyond the axis change
+        key = (self.data.fingerprint, start_idx, end_idx, self.plot_width(chart_view))
+        if self.view_slices.get(chart_view) == key:
+            return
+
+        # Refill the chart's existing series with the range-limited data
+        self.update_chart_series(chart_view, start_idx, end_idx)
 
     def update_all_plots(self):
         for view, controls in [
@@ -832,164 +1442,170 @@ class SwitchingAnalysisApp(QMainWindow):
             self.update_plot_range(view, controls.start_time.value(), controls.end_time.value())
 
     def export_data(self):
+        if self.export_thread is not None or not self.data:
+            return
         filename, _ = QFileDialog.getSaveFileName(self, "Export Data", "", "Excel Files (*.xlsx)")
         if filename:
-            workbook = xlsxwriter.Workbook(filename)
-            
-            # Export data and charts for each tab
-            self.export_tab_data(workbook, "Turn-off", self.turn_off_view)
-            self.export_tab_data(workbook, "Turn-on", self.turn_on_view)
-            self.export_tab_data(workbook, "Reverse Recovery", self.reverse_recovery_view)
-            self.export_tab_data(workbook, "VGS Transient", self.vgs_transient_view)
-            
-            workbook.close()
+            self.start_background_export(filename)
 
-    def export_tab_data(self, workbook, sheet_name, chart_view):
-        worksheet = workbook.add_worksheet(sheet_name)
-        
-        # Get the appropriate controls based on sheet name
-        if sheet_name == "Turn-off":
-            controls = self.turn_off_controls
-        elif sheet_name == "Turn-on":
-            controls = self.turn_on_controls
-        elif sheet_name == "Reverse Recovery":
-            controls = self.reverse_recovery_controls
-        elif sheet_name == "VGS Transient":
-            controls = self.vgs_transient_controls
-        else:
-            return
+    def create_export_worker(self, filename):
+        """ExportWorker for the current data, ranges, parameters and export options."""
+        # Parameters come from the result cache here, the worker only writes
+        sheets = []
+        for sheet_name, controls in [("Turn-off", self.turn_off_controls),
+                                     ("Turn-on", self.turn_on_controls),
+                                     ("Reverse Recovery", self.reverse_recovery_controls),
+                                     ("VGS Transient", self.vgs_transient_controls)]:
+            start_idx, end_idx = self.get_analysis_range(controls)
+            sheets.append((sheet_name, start_idx, end_idx, self.export_params(sheet_name)))
+        thresholds = self.analysis_thresholds()
 
-        # Get start and end indices based on time range
-        start_idx, end_idx = self.get_analysis_range(controls)
-        
-        # Add data headers
-        headers = ['Time', 'VGS', 'VDS', 'IS']
-        for col, header in enumerate(headers):
-            worksheet.write(0, col, header)
-        
-        # Write data within the selected range
-        if self.data:
-            row = 1
-            for i in range(start_idx, end_idx + 1):
-                worksheet.write(row, 0, self.data['time'][i])
-                worksheet.write(row, 1, self.data['vgs'][i])
-                worksheet.write(row, 2, self.data['vds'][i])
-                worksheet.write(row, 3, self.data['is'][i])
-                row += 1
-        
-        # Create Excel chart
-        chart = workbook.add_chart({'type': 'line'})
-        
-        # Get the number of rows with data in the selected range
-        num_rows = end_idx - start_idx + 1
-        
-        #if (' ' in sheet_name):# add single quote for sheet name with spaces
-        sheet_name = "\'" + sheet_name + "\'" # add single quote for all sheet names ion formulas / series
-        
-        # Add voltage series to primary y-axis
-        chart.add_series({
-            'name': 'VGS',
-            'categories': f'={sheet_name}!$A$2:$A${num_rows+1}',
-            'values': f'={sheet_name}!$B$2:$B${num_rows+1}',
-            'line': {'color': 'blue', 'width': 1.5},
-            'y_axis': 0,  # Primary axis
-        })
-        
-        chart.add_series({
-            'name': 'VDS',
-            'categories': f'={sheet_name}!$A$2:$A${num_rows+1}',
-            'values': f'={sheet_name}!$C$2:$C${num_rows+1}',
-            'line': {'color': 'red', 'width': 1.5},
-            'y_axis': 0,  # Primary axis
-        })
-        
-        # Add current series to secondary y-axis
-        chart.add_series({
-            'name': 'IS',
-            'categories': f'={sheet_name}!$A$2:$A${num_rows+1}',
-            'values': f'={sheet_name}!$D$2:$D${num_rows+1}',
-            'line': {'color': 'green', 'width': 1.5},
-            'y2_axis': True,  # Secondary axis
-        })
-        
-        # Configure chart
-        chart.set_title({'name': sheet_name})
-        chart.set_x_axis({
-            'name': 'Time (s)',
-            'major_gridlines': {'visible': True},
-        })
-        
-        # Configure primary y-axis (voltage)
-        chart.set_y_axis({
-            'name': 'Voltage (V)',
-            'major_gridlines': {'visible': True},
-        })
-        
-        # Configure secondary y-axis (current)
-        chart.set_y2_axis({
-            'name': 'Current (A)',
-            'major_gridlines': {'visible': True},
-        })
-        
-        chart.set_legend({'position': 'bottom'})
-        chart.set_size({'width': 720, 'height': 480})
-        
-        # Insert chart into worksheet
-        worksheet.insert_chart('F2', chart)
-        
-        # Add analysis parameters if available
+        sidecar = None
+        if self.sidecar_export.isChecked():
+            sidecar = os.path.splitext(filename)[0] + '.npz'
+
+        return ExportWorker(filename, self.data, sheets, thresholds, sidecar, self.profiler)
+
+    def start_background_export(self, filename):
+        self.export_thread = QThread(self)
+        self.export_worker = self.create_export_worker(filename)
+        self.export_worker.moveToThread(self.export_thread)
+
+        self.export_thread.started.connect(self.export_worker.run)
+        self.export_worker.progress.connect(self.update_export_progress)
+        self.export_worker.finished.connect(self.on_export_finished)
+        self.export_worker.failed.connect(self.on_export_failed)
+        self.export_worker.cancelled.connect(self.on_export_cancelled)
+
+        self.export_button.setEnabled(False)
+        self.export_progress.setValue(0)
+        self.export_progress.setFormat("Exporting...")
+        self.export_progress.setVisible(True)
+        self.cancel_export_button.setVisible(True)
+        self.export_thread.start()
+
+    def cancel_export(self):
+        if self.export_worker is not None:
+            self.export_worker.cancel()
+
+    def update_export_progress(self, rows_written, total_rows):
+        if total_rows > 0:
+            self.export_progress.setValue(int(1000 * rows_written / total_rows))
+        self.export_progress.setFormat(f"Exporting {rows_written:,} / {total_rows:,} rows")
+
+    def on_export_finished(self, filename):
+        self.finish_background_export()
+        self.show_timings()
+
+    def on_export_failed(self, message):
+        self.finish_background_export()
+        QMessageBox.warning(self, "Export Data", f"Could not export data:\n{message}")
+
+    def on_export_cancelled(self):
+        self.finish_background_export()
+
+    def finish_background_export(self):
+        self.export_thread.quit()
+        self.export_thread.wait()
+        self.export_worker.deleteLater()
+        self.export_thread.deleteLater()
+        self.export_thread = None
+        self.export_worker = None
+
+        self.export_button.setEnabled(True)
+        self.export_progress.setVisible(False)
+        self.cancel_export_button.setVisible(False)
+
+    def closeEvent(self, event):
+        """Stop the stream, load and export workers before the window and its threads go away.
+
+        Qt aborts the process when a QThread is destroyed while still
+        running, so each worker is cancelled and its thread waited for.
+        """
+        for worker, thread in [(self.stream_worker, self.stream_thread),
+                               (self.load_worker, self.load_thread),
+                               (self.export_worker, self.export_thread)]:
+            if worker is not None:
+                worker.cancel()
+            if thread is not None:
+                thread.quit()
+                thread.wait()
+        event.accept()
+
+    def deskew_params(self):
+        """Parameter block lines recording the probe deskew behind Eon and Eoff."""
+        skews = self.skews()
+        lines = [f"  {name.upper()} delay: {skew * 1e9:.2f} ns" for name, skew in skews.items()]
+        if self.resample_uniform.isChecked():
+            lines.append("  Resampled to a uniform time base")
+        return ["Probe deskew:"] + lines if lines else []
+
+    def export_params(self, sheet_name):
+        """Lines of the parameter block written next to a tab's exported data."""
         if sheet_name == "Turn-off":
             params = self.calculate_turn_off_params()
-            row = 2
-            worksheet.write(row, 8, "Turn-off Parameters")
-            worksheet.write(row+1, 8, f"90% VGS: {params['vgs_90']:.2f} V")
-            worksheet.write(row+2, 8, f"toff: {params['t_off']:.2e} s")
-            worksheet.write(row+3, 8, f"td(off): {params['td_off']:.2e} s")
-            worksheet.write(row+4, 8, f"dV/dt_off: {params['dv_dt_off']:.2e} V/s")
-            worksheet.write(row+5, 8, f"dI/dt_off: {params['di_dt_off']:.2e} A/s")
-            worksheet.write(row+6, 8, f"10% VDS: {params['vds_10']:.2f} V")
-            worksheet.write(row+7, 8, f"10% IS: {params['is_10']:.2f} A")
-            worksheet.write(row+8, 8, f"Eoff: {params['e_off']:.2e} J")
+            return ["Turn-off Parameters",
+                    f"{params['high_pct']}% VGS: {params['vgs_90']:.2f} V",
+                    f"toff: {params['t_off']:.2e} s",
+                    f"td(off): {params['td_off']:.2e} s",
+                    f"dV/dt_off: {params['dv_dt_off']:.2e} V/s",
+                    f"dI/dt_off: {params['di_dt_off']:.2e} A/s",
+                    f"{params['low_pct']}% VDS: {params['vds_10']:.2f} V",
+                    f"{params['low_pct']}% IS: {params['is_10']:.2f} A",
+                    f"Eoff: {params['e_off']:.2e} J"] + self.deskew_params()
         
         elif sheet_name == "Turn-on":
             params = self.calculate_turn_on_params()
-            row = 2
-            worksheet.write(row, 8, "Turn-on Parameters")
-            worksheet.write(row+1, 8, f"10% VGS: {params['vgs_10']:.2f} V")
-            worksheet.write(row+2, 8, f"ton: {params['t_on']:.2e} s")
-            worksheet.write(row+3, 8, f"td(on): {params['td_on']:.2e} s")
-            worksheet.write(row+4, 8, f"dV/dt_on: {params['dv_dt_on']:.2e} V/s")
-            worksheet.write(row+5, 8, f"dI/dt_on: {params['di_dt_on']:.2e} A/s")
-            worksheet.write(row+6, 8, f"90% VDS: {params['vds_90']:.2f} V")
-            worksheet.write(row+7, 8, f"90% IS: {params['is_90']:.2f} A")
-            worksheet.write(row+8, 8, f"Eon: {params['e_on']:.2e} J")
+            return ["Turn-on Parameters",
+                    f"{params['low_pct']}% VGS: {params['vgs_10']:.2f} V",
+                    f"ton: {params['t_on']:.2e} s",
+                    f"td(on): {params['td_on']:.2e} s",
+                    f"dV/dt_on: {params['dv_dt_on']:.2e} V/s",
+                    f"dI/dt_on: {params['di_dt_on']:.2e} A/s",
+                    f"{params['high_pct']}% VDS: {params['vds_90']:.2f} V",
+                    f"{params['high_pct']}% IS: {params['is_90']:.2f} A",
+                    f"Eon: {params['e_on']:.2e} J"] + self.deskew_params()
         
         elif sheet_name == "Reverse Recovery":
             params = self.calculate_reverse_recovery_params()
-            row = 2
-            worksheet.write(row, 8, "Reverse Recovery Parameters")
-            worksheet.write(row+1, 8, f"IF: {params['If']:.2f} A")
-            worksheet.write(row+2, 8, f"IRRM: {params['Irrm']:.2f} A") 
-            worksheet.write(row+3, 8, f"dI/dt: {params['di_dt']:.2e} A/s")
-            worksheet.write(row+4, 8, f"trr: {params['trr']:.2e} s")
-            worksheet.write(row+5, 8, f"tf: {params['tf']:.2e} s")
-            worksheet.write(row+6, 8, f"ts: {params['ts']:.2e} s")
-            worksheet.write(row+7, 8, f"Qrr: {params['Qrr']:.2e} C")
+            return ["Reverse Recovery Parameters",
+                    f"IF: {params['If']:.2f} A",
+                    f"IRRM: {params['Irrm']:.2f} A",
+                    f"dI/dt: {params['di_dt']:.2e} A/s",
+                    f"trr: {params['trr']:.2e} s",
+                    f"tf: {params['tf']:.2e} s",
+                    f"ts: {params['ts']:.2e} s",
+                    f"Qrr: {params['Qrr']:.2e} C"]
 
         elif sheet_name == "VGS Transient":
             params = self.calculate_vgs_transient_params()
-            row = 2
-            worksheet.write(row, 8, "VGS Transient Parameters")
-            worksheet.write(row+1, 8, f"VGS-static: {params['vgs_static']:.2f} V")
-            worksheet.write(row+2, 8, f"  Static High: {params['static_high']:.2f} V")
-            worksheet.write(row+3, 8, f"  Static Low: {params['static_low']:.2f} V")
-            worksheet.write(row+4, 8, f"VGS-dynamic: {params['vgs_dynamic']:.2f} V")
-            worksheet.write(row+5, 8, f"  Dynamic High: {params['dynamic_high']:.2f} V")
-            worksheet.write(row+6, 8, f"  Dynamic Low: {params['dynamic_low']:.2f} V")
+            return ["VGS Transient Parameters",
+                    f"VGS-static: {params['vgs_static']:.2f} V",
+                    f"  Static High: {params['static_high']:.2f} V",
+                    f"  Static Low: {params['static_low']:.2f} V",
+                    f"VGS-dynamic: {params['vgs_dynamic']:.2f} V",
+                    f"  Dynamic High: {params['dynamic_high']:.2f} V",
+                    f"  Dynamic Low: {params['dynamic_low']:.2f} V"]
+        return []
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    window = SwitchingAnalysisApp()
+    parser = argparse.ArgumentParser(description="MOSFET switching loss analysis")
+    parser.add_argument('--renderer', choices=['charts', 'painter'], default='charts',
+                        help="Plot through QtCharts or the QPainter waveform view")
+    parser.add_argument('--storage', choices=STORAGE_TYPES, default='float64',
+                        help="Precision loaded captures are held at; float32 and int16 "
+                             "fit far longer captures in memory")
+    parser.add_argument('--profile', action='store_true',
+                        help="Time load, plot, analysis and export stages, shown in the status bar")
+    parser.add_argument('--trace', default=None, metavar='FILE',
+                        help="Also write every timing span to a Chrome trace JSON file on exit")
+    # Leave Qt's own arguments for QApplication
+    args, qt_args = parser.parse_known_args()
+    app = QApplication(sys.argv[:1] + qt_args)
+    profiler = Profiler(enabled=args.profile, trace=args.trace is not None)
+    if args.trace:
+        app.aboutToQuit.connect(lambda: profiler.write_trace(args.trace))
+    window = SwitchingAnalysisApp(args.renderer, profiler, args.storage)
     app.setStyle('Fusion')
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,2013 @@
+import os
+import json
+import shutil
+import bisect
+import struct
+import hashlib
+import functools
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from time import perf_counter_ns
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Channel names used throughout the switching-loss tools, in CSV column order
+CHANNELS = ('time', 'vgs', 'vds', 'is')
+
+# CSV header for each channel
+CSV_COLUMNS = {'time': 'Time', 'vgs': 'Vgs', 'vds': 'Vds', 'is': 'Is'}
+
+DEFAULT_UNITS = {'time': 's', 'vgs': 'V', 'vds': 'V', 'is': 'A'}
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'switching_loss')
+DEFAULT_CACHE_BYTES = 4 * 1024**3
+
+# Bytes hashed from each end of a capture when building its cache key
+HASH_BLOCK_SIZE = 1024**2
+
+# Analysis results kept by ResultCache
+RESULT_CACHE_ENTRIES = 64
+
+# Spans kept for the trace file, the oldest are dropped beyond this
+TRACE_EVENTS = 1000000
+
+# Size of the text blocks parsed per step by the chunked CSV reader
+CHUNK_BYTES = 16 * 1024**2
+
+# Min/max pyramid layout: samples per bucket on the first level, the
+# reduction factor between levels, and the smallest level worth keeping
+LOD_BASE_BUCKET = 16
+LOD_FACTOR = 4
+LOD_MIN_BUCKETS = 512
+
+# Relative jitter in the sample interval still treated as a uniform time base
+UNIFORM_TOLERANCE = 1e-6
+
+# Precision loaded channels can be stored at, see compact_waveform()
+STORAGE_TYPES = ('float64', 'float32', 'int16')
+
+# Samples per block when scanning the time base
+SCAN_BLOCK = 1024**2
+
+# Samples between the stored points of a prefix integral, a divisor of SCAN_BLOCK
+INTEGRAL_BLOCK = 4096
+
+# Samples per block when the analyses upcast a channel, small enough to stay in cache
+ANALYSIS_BLOCK = 65536
+
+
+class WaveformStore:
+    """Columnar container holding one contiguous array per channel."""
+
+    def __init__(self, channels, units=None, source=None, time_index=None):
+        self.channels = {}
+        for name in CHANNELS:
+            # Lazy channels are read where they are stored, never copied here
+            arr = channels[name]
+            self.channels[name] = arr if isinstance(arr, LazyChannel) else np.ascontiguousarray(arr)
+
+        lengths = {len(arr) for arr in self.channels.values()}
+        if len(lengths) > 1:
+            raise ValueError("All channels must have the same number of samples")
+
+        self.units = dict(DEFAULT_UNITS)
+        if units:
+            self.units.update(units)
+        self.source = source
+
+        # Nominal sample interval from the first and last timestamps
+        time = self.channels['time']
+        if len(time) > 1:
+            self.sample_interval = float(time[-1] - time[0]) / (len(time) - 1)
+        else:
+            self.sample_interval = 0.0
+
+        self.pyramids = {}
+        self.integrals = {}
+        # A TimeIndex of the same time base may be passed in rather than rebuilt
+        self._time_index = time_index
+        self._fingerprint = None
+
+    def __getitem__(self, name):
+        return self.channels[name]
+
+    def __len__(self):
+        return len(self.channels['time'])
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __contains__(self, name):
+        return name in self.channels
+
+    @property
+    def t_start(self):
+        return float(self.channels['time'][0]) if len(self) else 0.0
+
+    @property
+    def t_end(self):
+        return float(self.channels['time'][-1]) if len(self) else 0.0
+
+    @property
+    def nbytes(self):
+        return sum(arr.nbytes for arr in self.channels.values())
+
+    @property
+    def fingerprint(self):
+        """Short digest identifying this data, built from its shape, source and edge samples.
+
+        A source file's size and modification time are included, so a capture
+        re-acquired to the same path is never taken for the previous one
+        even when its first and last samples match.
+        """
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(f"{self.source}|{len(self)}".encode())
+            if self.source is not None and os.path.isfile(self.source):
+                stat = os.stat(self.source)
+                digest.update(f"|{stat.st_size}|{stat.st_mtime_ns}".encode())
+            for name in CHANNELS:
+                arr = self.channels[name]
+                digest.update(str(arr.dtype).encode())
+                digest.update(np.ascontiguousarray(arr[:512]).tobytes())
+                digest.update(np.ascontiguousarray(arr[-512:]).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def pyramid(self, name):
+        """Return the min/max pyramid of a channel, building it on first use."""
+        if name not in self.pyramids:
+            self.pyramids[name] = MinMaxPyramid(self.channels[name])
+        return self.pyramids[name]
+
+    @property
+    def time_index(self):
+        if self._time_index is None:
+            self._time_index = TimeIndex(self.channels['time'])
+        return self._time_index
+
+    def integral(self, name, cumulative=None):
+        """Return the prefix integral of 'is' (charge) or 'power' (vds * is, energy)."""
+        if name not in self.integrals:
+            factors = ([self.channels['vds'], self.channels['is']] if name == 'power'
+                       else [self.channels[name]])
+            self.integrals[name] = PrefixIntegral(self.channels['time'], factors, self.time_index,
+                                                  cumulative=cumulative)
+        return self.integrals[name]
+
+    @property
+    def prepared(self):
+        """True once everything prepare() builds is in place, built or attached."""
+        return (self._time_index is not None
+                and all(name in self.pyramids for name in CHANNELS[1:])
+                and all(name in self.integrals for name in ('is', 'power')))
+
+    def prepare(self):
+        """Build the time index, LOD pyramids and prefix integrals ahead of the first redraw."""
+        self.time_index
+        for name in CHANNELS[1:]:
+            self.pyramid(name)
+        self.integral('is')
+        self.integral('power')
+
+    def summaries(self):
+        """(meta, arrays) of the built time index, pyramids and integrals, for WaveformCache.
+
+        Only what prepare() has built is included; arrays are keyed by the
+        file name they are saved under.
+        """
+        meta = {'integral_block': INTEGRAL_BLOCK, 'lod': {}, 'integrals': []}
+        arrays = {}
+        if self._time_index is not None:
+            meta['uniform'] = self._time_index.is_uniform
+        for name, pyramid in self.pyramids.items():
+            meta['lod'][name] = []
+            for level, (bucket, mins, maxs) in enumerate(pyramid.levels):
+                meta['lod'][name].append(bucket)
+                arrays[f"lod_{name}_{level}_min"] = mins
+                arrays[f"lod_{name}_{level}_max"] = maxs
+        for name, integral in self.integrals.items():
+            meta['integrals'].append(name)
+            arrays[f"integral_{name}"] = integral.cumulative
+        return meta, arrays
+
+    def attach_summaries(self, meta, arrays):
+        """Use saved summaries from summaries() rather than building them from the samples."""
+        if meta.get('integral_block') != INTEGRAL_BLOCK:
+            return
+        if 'uniform' in meta:
+            self._time_index = TimeIndex(self.channels['time'], meta['uniform'])
+        for name, buckets in meta['lod'].items():
+            levels = [(bucket, arrays[f"lod_{name}_{level}_min"], arrays[f"lod_{name}_{level}_max"])
+                      for level, bucket in enumerate(buckets)]
+            self.pyramids[name] = MinMaxPyramid(self.channels[name], levels)
+        for name in meta['integrals']:
+            self.integral(name, arrays[f"integral_{name}"])
+
+    def envelope(self, name, start_idx, end_idx, width):
+        """Return (time, values) of a channel over start_idx..end_idx sized for width pixels."""
+        return self.pyramid(name).envelope(self.channels['time'], start_idx, end_idx, width)
+
+
+class TimeIndex:
+    """Maps times to sample indices without scanning the time base.
+
+    A uniformly sampled record is resolved arithmetically in O(1); anything
+    else falls back to binary search on the (monotonic) time array.
+    """
+
+    def __init__(self, time, is_uniform=None):
+        self.time = time
+        self.count = len(time)
+        self.t0 = float(time[0]) if self.count else 0.0
+        self.dt = float(time[-1] - time[0]) / (self.count - 1) if self.count > 1 else 0.0
+        # A known answer, such as a saved one, skips the scan of the time base
+        if is_uniform is None:
+            is_uniform = getattr(time, 'is_uniform', False) or self._check_uniform()
+        self.is_uniform = self.dt > 0 and bool(is_uniform)
+
+    def _check_uniform(self):
+        tolerance = self.dt * UNIFORM_TOLERANCE
+        for start in range(0, self.count - 1, SCAN_BLOCK):
+            steps = np.diff(self.time[start:start + SCAN_BLOCK + 1])
+            if np.abs(steps - self.dt).max() > tolerance:
+                return False
+        return True
+
+    def index_at(self, t):
+        """Return the first index whose time is >= t, clipped to the record."""
+        if self.count == 0:
+            return 0
+        if not self.is_uniform:
+            return min(int(np.searchsorted(self.time, t, side='left')), self.count - 1)
+
+        idx = int(np.clip(np.ceil((t - self.t0) / self.dt), 0, self.count - 1))
+        # Rounding in the arithmetic can land one sample off, settle on the stored times
+        if idx > 0 and self.time[idx - 1] >= t:
+            idx -= 1
+        elif idx < self.count - 1 and self.time[idx] < t:
+            idx += 1
+        return idx
+
+    def index_range(self, start_time, end_time):
+        """Return (start_idx, end_idx) covering start_time..end_time, with end_idx >= start_idx."""
+        start_idx = self.index_at(start_time)
+        end_idx = self.index_at(end_time)
+        return start_idx, max(end_idx, start_idx)
+
+    def time_at(self, idx):
+        return float(self.time[idx])
+
+
+class PrefixIntegral:
+    """Cumulative trapezoidal integral of the product of one or more channels.
+
+    Built once per load, keeping the running integral only at every
+    INTEGRAL_BLOCK-th sample. The integral up to any time is the stored
+    value before it plus the trapezoids from there, computed from at most
+    INTEGRAL_BLOCK samples read on demand, so only those windows are ever
+    upcast to float64 and the summary is a small fraction of the channels.
+    """
+
+    def __init__(self, time, factors, time_index, block=INTEGRAL_BLOCK, cumulative=None):
+        self.time = time
+        self.factors = factors
+        self.time_index = time_index
+        self.block = block
+
+        # cumulative[k] is the integral from the first sample to sample k * block
+        if cumulative is not None:
+            self.cumulative = cumulative
+            return
+        count = len(time)
+        self.cumulative = np.zeros(max((count - 1) // block + 1, 1))
+        running = 0.0
+        # Build SCAN_BLOCK samples at a time, a whole number of blocks, so the
+        # temporaries stay SCAN_BLOCK sized
+        for start in range(0, count - 1, SCAN_BLOCK):
+            stop = min(start + SCAN_BLOCK, count - 1)
+            area = self._area(start, stop)
+            totals = running + np.cumsum(np.add.reduceat(area, np.arange(0, len(area), block)))
+            # A trailing partial block ends past the last sample and has no entry
+            first = start // block + 1
+            stored = min(len(totals), len(self.cumulative) - first)
+            self.cumulative[first:first + stored] = totals[:stored]
+            running = totals[-1]
+
+    def _values(self, index):
+        values = np.asarray(self.factors[0][index], dtype=np.float64)
+        for factor in self.factors[1:]:
+            values = values * factor[index]
+        return values
+
+    def _area(self, start, stop):
+        """Trapezoid areas of the intervals between samples start and stop."""
+        values = self._values(slice(start, stop + 1))
+        return (values[1:] + values[:-1]) / 2 * np.diff(self.time[start:stop + 1])
+
+    def at(self, t):
+        """Return the integral from the first sample up to time t."""
+        if len(self.time) < 2:
+            return 0.0
+
+        t, i = self._sample_at(t)
+
+        # Integral up to sample i from the stored value at the start of its block
+        base = i - i % self.block
+        total = float(self.cumulative[i // self.block])
+        if i > base:
+            total += float(self._area(base, i).sum())
+        return total + self._partial(i, t)
+
+    def _sample_at(self, t):
+        """Clip t to the record and return it with the last sample index at or before it."""
+        t = min(max(t, float(self.time[0])), float(self.time[-1]))
+        i = self.time_index.index_at(t)
+        if float(self.time[i]) > t:
+            i -= 1
+        return t, i
+
+    def _partial(self, i, t):
+        """Partial trapezoid from sample i to t with the value interpolated at t."""
+        if i >= len(self.time) - 1:
+            return 0.0
+        t0, t1 = float(self.time[i]), float(self.time[i + 1])
+        v0, v1 = self._values(slice(i, i + 2))
+        v_t = v0 + (v1 - v0) * (t - t0) / (t1 - t0)
+        return (v0 + v_t) / 2 * (t - t0)
+
+    def between(self, t1, t2):
+        """Return the integral from t1 to t2, or nan if either edge is unknown."""
+        if np.isnan(t1) or np.isnan(t2):
+            return np.nan
+        return self.at(t2) - self.at(t1)
+
+
+class WindowIntegral(PrefixIntegral):
+    """PrefixIntegral without the stored prefix, integrating each requested window directly.
+
+    For channels computed on read, such as deskewed ones, a prefix would
+    have to convert the whole record for every change; between() reads
+    only the samples from t1 to t2, ANALYSIS_BLOCK at a time.
+    """
+
+    def __init__(self, time, factors, time_index):
+        self.time = time
+        self.factors = factors
+        self.time_index = time_index
+
+    def at(self, t):
+        return self.between(float(self.time[0]), t) if len(self.time) else 0.0
+
+    def between(self, t1, t2):
+        if np.isnan(t1) or np.isnan(t2):
+            return np.nan
+        if len(self.time) < 2:
+            return 0.0
+        t1, i1 = self._sample_at(t1)
+        t2, i2 = self._sample_at(t2)
+        first, last = min(i1, i2), max(i1, i2)
+        total = 0.0
+        for start in range(first, last, ANALYSIS_BLOCK):
+            total += float(self._area(start, min(start + ANALYSIS_BLOCK, last)).sum())
+        if i2 < i1:
+            total = -total
+        return total + self._partial(i2, t2) - self._partial(i1, t1)
+
+
+class MinMaxPyramid:
+    """Multi-resolution min/max summary of one channel.
+
+    Level k holds the min and max of every LOD_BASE_BUCKET * LOD_FACTOR**k
+    consecutive samples. Drawing the min and max of each bucket keeps narrow
+    glitches visible at every zoom level.
+    """
+
+    def __init__(self, values, levels=None):
+        self.values = values
+        self.levels = []
+
+        # Levels saved from an earlier build are used as they are
+        if levels is not None:
+            self.levels = levels
+            return
+        if len(values) < LOD_BASE_BUCKET * LOD_MIN_BUCKETS:
+            return
+
+        # The first level is reduced block by block (SCAN_BLOCK is a whole number
+        # of buckets), so a memory-mapped or lazy channel is read through once
+        # without a full-size temporary. Scaled integers are reduced raw and
+        # only the bucket extremes are converted.
+        bucket = LOD_BASE_BUCKET
+        source = values.raw if isinstance(values, ScaledChannel) else values
+        reduced = [self._reduce(block, block, LOD_BASE_BUCKET)
+                   for block in (np.asarray(source[start:start + SCAN_BLOCK])
+                                 for start in range(0, len(source), SCAN_BLOCK))]
+        mins = np.concatenate([block_mins for block_mins, _ in reduced])
+        maxs = np.concatenate([block_maxs for _, block_maxs in reduced])
+        if source is not values:
+            mins, maxs = values.convert(mins), values.convert(maxs)
+            if values.scale < 0:
+                mins, maxs = maxs, mins
+        while True:
+            self.levels.append((bucket, mins, maxs))
+            if len(mins) < LOD_FACTOR * LOD_MIN_BUCKETS:
+                break
+            mins, maxs = self._reduce(mins, maxs, LOD_FACTOR)
+            bucket *= LOD_FACTOR
+
+    @staticmethod
+    def _reduce(mins, maxs, factor):
+        # Pad the tail with its last value so it reshapes evenly without
+        # changing any bucket's min or max
+        count = -(-len(mins) // factor)
+        pad = count * factor - len(mins)
+        if pad:
+            mins = np.concatenate([mins, np.repeat(mins[-1:], pad)])
+            maxs = np.concatenate([maxs, np.repeat(maxs[-1:], pad)])
+        return (mins.reshape(count, factor).min(axis=1),
+                maxs.reshape(count, factor).max(axis=1))
+
+    @property
+    def nbytes(self):
+        return sum(mins.nbytes + maxs.nbytes for _, mins, maxs in self.levels)
+
+    def extremes(self):
+        """(min, max) of the whole channel from its coarsest level, or None without levels."""
+        if not self.levels:
+            return None
+        _, mins, maxs = self.levels[-1]
+        return float(mins.min()), float(maxs.max())
+
+    def select_level(self, count, width):
+        """Return the coarsest level that still gives at least width buckets, or None for raw."""
+        chosen = None
+        for level in self.levels:
+            if count // level[0] >= width:
+                chosen = level
+            else:
+                break
+        return chosen
+
+    def envelope(self, time, start_idx, end_idx, width):
+        """Return (time, values) for start_idx..end_idx with about 2 * width points."""
+        end_idx = min(end_idx, len(self.values) - 1)
+        if end_idx < start_idx:
+            return np.empty(0), np.empty(0)
+
+        count = end_idx - start_idx + 1
+        level = self.select_level(count, max(int(width), 1)) if count > 2 * width else None
+        if level is None:
+            return (np.asarray(time[start_idx:end_idx + 1], dtype=np.float64),
+                    np.asarray(self.values[start_idx:end_idx + 1], dtype=np.float64))
+
+        bucket, mins, maxs = level
+        first, last = start_idx // bucket, end_idx // bucket
+        bucket_time = np.asarray(time[first * bucket:last * bucket + 1:bucket], dtype=np.float64)
+
+        # Min and max share the bucket's start time and draw as a vertical stroke
+        x = np.repeat(bucket_time, 2)
+        y = np.empty(len(x))
+        y[0::2] = mins[first:last + 1]
+        y[1::2] = maxs[first:last + 1]
+        return x, y
+
+
+def read_csv_header(file):
+    """Read the header line and return the column index of each channel."""
+    header = [name.strip() for name in file.readline().strip().split(',')]
+    try:
+        return [header.index(CSV_COLUMNS[name]) for name in CHANNELS]
+    except ValueError:
+        raise ValueError(f"CSV must contain the columns {', '.join(CSV_COLUMNS.values())}")
+
+
+class LoadCancelled(Exception):
+    """Raised when a load is cancelled part way through."""
+
+
+def read_csv_chunks(filename, chunk_bytes=CHUNK_BYTES):
+    """Yield (table, bytes_read, total_bytes) for fixed-size blocks of a capture CSV.
+
+    Each block is cut at the last complete line and parsed with one
+    vectorized np.loadtxt call, so memory stays proportional to chunk_bytes.
+    """
+    total_bytes = os.path.getsize(filename)
+    with open(filename, 'r', newline='') as file:
+        columns = read_csv_header(file)
+        bytes_read = file.tell()
+        remainder = ''
+        while True:
+            block = file.read(chunk_bytes)
+            if not block:
+                break
+            block = remainder + block
+            cut = block.rfind('\n') + 1
+            if cut == 0:
+                remainder = block
+                continue
+            remainder = block[cut:]
+            bytes_read += len(block[:cut].encode())
+            yield (np.loadtxt(block[:cut].splitlines(), delimiter=',', usecols=columns,
+                              dtype=np.float64, ndmin=2),
+                   bytes_read, total_bytes)
+
+        if remainder.strip():
+            yield (np.loadtxt([remainder], delimiter=',', usecols=columns,
+                              dtype=np.float64, ndmin=2),
+                   total_bytes, total_bytes)
+
+
+def load_waveform_csv(filename, storage='float64', progress=None, is_cancelled=None):
+    """Parse a scope capture CSV into a WaveformStore, one vectorized block at a time.
+
+    storage is one of STORAGE_TYPES, see compact_waveform().
+    progress(bytes_read, total_bytes, rows) is called after every block and
+    is_cancelled() is polled between blocks; a True result raises LoadCancelled.
+    """
+    # int16 needs each channel's full range first, so it is staged as float32
+    dtype = np.float64 if storage == 'float64' else np.float32
+    chunks = {name: [] for name in CHANNELS}
+    rows = 0
+    for table, bytes_read, total_bytes in read_csv_chunks(filename):
+        if is_cancelled is not None and is_cancelled():
+            raise LoadCancelled(filename)
+        for col, name in enumerate(CHANNELS):
+            # Time stays float64 so long captures keep sub-sample resolution
+            channel_dtype = np.float64 if name == 'time' else dtype
+            chunks[name].append(table[:, col].astype(channel_dtype))
+        rows += len(table)
+        if progress is not None:
+            progress(bytes_read, total_bytes, rows)
+
+    channels = {}
+    for name in CHANNELS:
+        channel_dtype = np.float64 if name == 'time' else dtype
+        channels[name] = (np.concatenate(chunks[name]) if chunks[name]
+                          else np.empty(0, dtype=channel_dtype))
+        chunks[name] = None
+
+    return compact_waveform(WaveformStore(channels, source=filename), storage)
+
+
+def quantization(low, high, sample_dtype):
+    """(scale, offset) mapping low..high onto the integer range of sample_dtype.
+
+    The offset is a whole number of steps, as on a scope, so 0 V and 0 A
+    stay exactly zero; one step of range is given up to allow for it.
+    """
+    info = np.iinfo(sample_dtype)
+    scale = (high - low) / (info.max - info.min - 1) or 1.0
+    offset = (np.round(low / scale) - info.min) * scale
+    return scale, float(offset)
+
+
+def quantize_channel(values, block_rows=SCAN_BLOCK):
+    """Quantize a channel to int16 over its own range, as a ScaledChannel."""
+    info = np.iinfo(np.int16)
+    low = float(np.min(values)) if len(values) else 0.0
+    high = float(np.max(values)) if len(values) else 0.0
+    scale, offset = quantization(low, high, np.int16)
+
+    raw = np.empty(len(values), dtype=np.int16)
+    for start in range(0, len(values), block_rows):
+        block = np.asarray(values[start:start + block_rows], dtype=np.float64)
+        raw[start:start + block_rows] = np.clip(np.rint((block - offset) / scale),
+                                                info.min, info.max)
+    return ScaledChannel(raw, scale, offset)
+
+
+def compact_waveform(waveform, storage):
+    """Return waveform with its channels held at the given storage precision.
+
+    'float64' leaves it unchanged. 'float32' keeps about 7 significant
+    digits per sample. 'int16' quantizes each channel to 65536 steps between
+    its own minimum and maximum, so every sample is within half a step,
+    (max - min) / 131068, of its float64 value. A 12-bit scope is resolved
+    exactly and a 16-bit one to within its last bit.
+
+    Both compact modes also replace a uniform time base with UniformTime,
+    whose times differ from the stored ones by less than UNIFORM_TOLERANCE
+    of a sample interval. The analyses and integrals read windows as float64
+    either way. On noisy synthetic double-pulse captures, int16 results stay
+    within 0.1% of float64 for energies and charges and move edge times by
+    well under a sample interval; float32 stays within 1e-6. Only times tied
+    to an exact peak on a noise-free flat top can move by a few samples.
+    """
+    if storage == 'float64':
+        return waveform
+    if storage not in STORAGE_TYPES:
+        raise ValueError(f"Storage must be one of {', '.join(STORAGE_TYPES)}")
+
+    channels = {}
+    time = waveform['time']
+    index = waveform.time_index
+    channels['time'] = (UniformTime(index.t0, index.dt, len(time)) if index.is_uniform
+                        else time)
+    for name in CHANNELS[1:]:
+        if storage == 'int16':
+            channels[name] = quantize_channel(waveform[name])
+        else:
+            channels[name] = np.asarray(waveform[name], dtype=np.float32)
+    return WaveformStore(channels, units=waveform.units, source=waveform.source)
+
+
+def write_waveform_csv(waveform, filename, block_rows=SCAN_BLOCK):
+    """Write a WaveformStore as a capture CSV that load_waveform_csv reads back."""
+    with open(filename, 'w', newline='') as file:
+        file.write(','.join(CSV_COLUMNS[name] for name in CHANNELS) + '\n')
+        for start in range(0, len(waveform), block_rows):
+            block = np.column_stack([waveform[name][start:start + block_rows] for name in CHANNELS])
+            # Time keeps more digits so long captures stay on a uniform time base
+            np.savetxt(file, block, delimiter=',', fmt=['%.12g', '%.9g', '%.9g', '%.9g'])
+
+
+# Raw binary captures
+#
+# A binary capture is a fixed header followed by the raw samples of each
+# channel in turn (VGS, VDS and IS, in header order), all little-endian:
+#
+#   magic        8 bytes  BINARY_MAGIC
+#   data_offset  uint32   byte offset of the first sample
+#   sample_type  1 byte   b'b' for int8, b'h' for int16
+#   (padding)    1 byte
+#   channels     uint16   number of channel records that follow
+#   samples      uint64   samples per channel
+#   t0           float64  time of the first sample (s)
+#   interval     float64  sample interval (s)
+#   per channel: name (8 bytes, ASCII, NUL padded), scale, offset (float64)
+#
+# A sample's value is raw * scale + offset; time is t0 + index * interval.
+
+BINARY_MAGIC = b'SWLBIN01'
+BINARY_HEADER = struct.Struct('<8sIcxHQdd')
+BINARY_CHANNEL = struct.Struct('<8sdd')
+BINARY_SAMPLE_TYPES = {b'b': np.int8, b'h': np.int16}
+
+
+class LazyChannel:
+    """Read-only, array-like channel whose samples are computed when indexed.
+
+    Indexing with an int, slice or index array returns float64 values of
+    just those samples, so only the windows that are plotted or analyzed
+    are ever converted. Whole-array NumPy calls go through __array__ and
+    convert the entire channel.
+    """
+
+    dtype = np.dtype(np.float64)
+    ndim = 1
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def shape(self):
+        return (self.size,)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._values(key)
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += self.size
+            if not 0 <= key < self.size:
+                raise IndexError("channel index out of range")
+            return float(self._values(slice(key, key + 1))[0])
+        return self._values(np.asarray(key))
+
+    def __array__(self, dtype=None):
+        values = self._values(slice(None))
+        return values if dtype is None else values.astype(dtype, copy=False)
+
+    def window(self, start, stop):
+        """Samples start..stop of this channel as a channel, without converting them."""
+        return ChannelWindow(self, start, stop)
+
+
+class ScaledChannel(LazyChannel):
+    """Channel stored as raw integers (typically memory-mapped), read as raw * scale + offset."""
+
+    def __init__(self, raw, scale=1.0, offset=0.0):
+        self.raw = raw
+        self.scale = float(scale)
+        self.offset = float(offset)
+        self.size = len(raw)
+
+    @property
+    def nbytes(self):
+        return self.raw.nbytes
+
+    def convert(self, raw):
+        """Float64 values of raw samples of this channel."""
+        values = np.asarray(raw).astype(np.float64)
+        values *= self.scale
+        values += self.offset
+        return values
+
+    def _values(self, key):
+        return self.convert(self.raw[key])
+
+    def window(self, start, stop):
+        return ScaledChannel(self.raw[start:stop], self.scale, self.offset)
+
+
+class UniformTime(LazyChannel):
+    """Time base of a uniformly sampled capture, computed from its first time and interval."""
+
+    # The time index can trust this without scanning the samples
+    is_uniform = True
+
+    def __init__(self, t0, interval, size):
+        self.t0 = float(t0)
+        self.interval = float(interval)
+        self.size = int(size)
+        self.nbytes = 0
+
+    def _values(self, key):
+        if isinstance(key, slice):
+            index = np.arange(*key.indices(self.size), dtype=np.float64)
+        else:
+            index = np.where(key < 0, key + self.size, key).astype(np.float64)
+        return self.t0 + index * self.interval
+
+
+class ChannelWindow(LazyChannel):
+    """Samples start..stop of another lazy channel, read through it on demand."""
+
+    def __init__(self, channel, start, stop):
+        start, stop, _ = slice(start, stop).indices(len(channel))
+        self.channel = channel
+        self.start = start
+        self.size = max(stop - start, 0)
+        self.nbytes = 0
+
+    def _values(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.size)
+            return self.channel[self.start + start:self.start + stop:step]
+        return self.channel[np.where(key < 0, key + self.size, key) + self.start]
+
+    def window(self, start, stop):
+        start, stop, _ = slice(start, stop).indices(self.size)
+        return ChannelWindow(self.channel, self.start + start, self.start + stop)
+
+
+def channel_window(values, start, stop):
+    """values[start:stop] as a view or lazy window, so no samples are converted or copied."""
+    if isinstance(values, LazyChannel):
+        return values.window(start, stop)
+    return values[start:stop]
+
+
+def channel_blocks(values, start=0, stop=None, block_rows=ANALYSIS_BLOCK):
+    """Yield (offset, float64 block) covering values[start:stop] block_rows samples at a time.
+
+    Lazy and narrow stored channels are upcast one block at a time, so a
+    whole-channel reduction never holds more than one block as float64.
+    """
+    stop = len(values) if stop is None else min(stop, len(values))
+    for offset in range(start, stop, block_rows):
+        yield offset, np.asarray(values[offset:min(offset + block_rows, stop)], dtype=np.float64)
+
+
+def channel_extremes(values, start=0, stop=None):
+    """(min, max) of values[start:stop], read block by block."""
+    low, high = np.inf, -np.inf
+    for _, block in channel_blocks(values, start, stop):
+        low = min(low, float(block.min()))
+        high = max(high, float(block.max()))
+    return low, high
+
+
+def channel_argmin(values, start=0, stop=None):
+    """Index of the first minimum of values[start:stop], read block by block."""
+    best, index = np.inf, start
+    for offset, block in channel_blocks(values, start, stop):
+        local = int(np.argmin(block))
+        if block[local] < best:
+            best, index = block[local], offset + local
+    return index
+
+
+def channel_argmax(values, start=0, stop=None):
+    """Index of the first maximum of values[start:stop], read block by block."""
+    best, index = -np.inf, start
+    for offset, block in channel_blocks(values, start, stop):
+        local = int(np.argmax(block))
+        if block[local] > best:
+            best, index = block[local], offset + local
+    return index
+
+
+def search_time(time, t):
+    """First index whose time is >= t, by binary search that reads only the probed samples."""
+    if isinstance(time, LazyChannel):
+        return bisect.bisect_left(time, t)
+    return int(np.searchsorted(time, t))
+
+
+def is_binary_capture(filename):
+    """True if filename starts with the binary capture magic."""
+    with open(filename, 'rb') as file:
+        return file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def load_waveform_binary(filename):
+    """Open a raw binary capture without reading its samples.
+
+    Each channel is memory-mapped and wrapped in a ScaledChannel, so opening
+    costs only the header, and samples are read and scaled as they are used.
+    """
+    with open(filename, 'rb') as file:
+        header = file.read(BINARY_HEADER.size)
+        if len(header) < BINARY_HEADER.size or header[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+            raise ValueError(f"{filename} is not a binary switching capture")
+        _, data_offset, sample_type, count, samples, t0, interval = BINARY_HEADER.unpack(header)
+        records = [BINARY_CHANNEL.unpack(file.read(BINARY_CHANNEL.size)) for _ in range(count)]
+
+    if sample_type not in BINARY_SAMPLE_TYPES:
+        raise ValueError(f"Unsupported sample type {sample_type!r} in {filename}")
+    sample_dtype = np.dtype(BINARY_SAMPLE_TYPES[sample_type])
+    if data_offset + count * samples * sample_dtype.itemsize > os.path.getsize(filename):
+        raise ValueError(f"{filename} is shorter than its header describes")
+
+    channels = {'time': UniformTime(t0, interval, samples)}
+    for index, (name, scale, offset) in enumerate(records):
+        raw = np.memmap(filename, dtype=sample_dtype, mode='r', shape=(samples,),
+                        offset=data_offset + index * samples * sample_dtype.itemsize)
+        channels[name.rstrip(b'\0').decode('ascii')] = ScaledChannel(raw, scale, offset)
+
+    missing = [name for name in CHANNELS if name not in channels]
+    if missing:
+        raise ValueError(f"Binary capture has no {', '.join(missing)} channel")
+    return WaveformStore(channels, source=filename)
+
+
+def write_waveform_binary(waveform, filename, sample_type=b'h', block_rows=SCAN_BLOCK):
+    """Write a uniformly sampled WaveformStore as a raw binary capture.
+
+    Each channel is quantized to the full range of the sample type between
+    its own minimum and maximum.
+    """
+    sample_dtype = np.dtype(BINARY_SAMPLE_TYPES[sample_type])
+    info = np.iinfo(sample_dtype)
+    names = CHANNELS[1:]
+    records = []
+    for name in names:
+        low, high = float(np.min(waveform[name])), float(np.max(waveform[name]))
+        records.append((name,) + quantization(low, high, sample_dtype))
+
+    data_offset = BINARY_HEADER.size + len(names) * BINARY_CHANNEL.size
+    with open(filename, 'wb') as file:
+        file.write(BINARY_HEADER.pack(BINARY_MAGIC, data_offset, sample_type, len(names),
+                                      len(waveform), waveform.t_start, waveform.sample_interval))
+        for name, scale, offset in records:
+            file.write(BINARY_CHANNEL.pack(name.encode('ascii'), scale, offset))
+        for name, scale, offset in records:
+            for start in range(0, len(waveform), block_rows):
+                block = np.asarray(waveform[name][start:start + block_rows], dtype=np.float64)
+                raw = np.clip(np.rint((block - offset) / scale), info.min, info.max)
+                file.write(raw.astype(sample_dtype).tobytes())
+
+
+class WaveformCache:
+    """Binary sidecar cache of parsed captures with a size cap and LRU eviction.
+
+    Each entry is a directory of per-channel .npy files plus a meta.json.
+    Entries are keyed by the source path, size, mtime, storage precision and
+    a hash of the first and last HASH_BLOCK_SIZE bytes, and are opened
+    memory-mapped so a reload only touches the pages that actually get read.
+    Scaled int16 channels are stored raw with their scale and offset in the
+    meta, and a uniform time base as its first time and interval alone.
+    The LOD pyramids, integral block sums and uniform-time flag built for a
+    capture are saved in its entry too, raw binary captures getting an
+    entry of their own for them.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, filename, storage='float64'):
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{path}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+        # float64 entries keep the keys they had before storage precisions existed
+        if storage != 'float64':
+            digest.update(storage.encode())
+        with open(path, 'rb') as file:
+            digest.update(file.read(HASH_BLOCK_SIZE))
+            if stat.st_size > 2 * HASH_BLOCK_SIZE:
+                file.seek(-HASH_BLOCK_SIZE, os.SEEK_END)
+                digest.update(file.read(HASH_BLOCK_SIZE))
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key)
+
+    def load(self, filename, storage='float64'):
+        """Return a memory-mapped WaveformStore for filename, or None on a miss."""
+        entry = self.entry_path(self.key(filename, storage))
+        meta_path = os.path.join(entry, 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+
+        try:
+            with open(meta_path, 'r') as file:
+                meta = json.load(file)
+            channels = {}
+            for name in CHANNELS:
+                if name == 'time' and 'uniform_time' in meta:
+                    channels[name] = UniformTime(*meta['uniform_time'])
+                    continue
+                channels[name] = np.load(os.path.join(entry, f"{name}.npy"), mmap_mode='r')
+                if name in meta.get('scaled', {}):
+                    channels[name] = ScaledChannel(channels[name], *meta['scaled'][name])
+        except (OSError, ValueError, TypeError):
+            # Corrupt or half-evicted entry, drop it and reparse
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        os.utime(meta_path)
+        return WaveformStore(channels, units=meta.get('units'), source=filename)
+
+    def save(self, filename, waveform, storage='float64'):
+        """Write waveform to the cache as the entry for filename at its storage precision."""
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self.entry_path(self.key(filename, storage))
+        meta = {'source': os.path.abspath(filename),
+                'units': waveform.units,
+                'samples': len(waveform)}
+
+        # Build the entry in a temporary directory so readers never see a partial one
+        staging = tempfile.mkdtemp(dir=self.directory, prefix='.staging-')
+        try:
+            for name in CHANNELS:
+                arr = waveform[name]
+                if isinstance(arr, UniformTime):
+                    meta['uniform_time'] = [arr.t0, arr.interval, arr.size]
+                    continue
+                if isinstance(arr, ScaledChannel):
+                    meta.setdefault('scaled', {})[name] = [arr.scale, arr.offset]
+                    arr = arr.raw
+                np.save(os.path.join(staging, f"{name}.npy"), arr)
+            with open(os.path.join(staging, 'meta.json'), 'w') as file:
+                json.dump(meta, file)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        self.evict(keep=entry)
+
+    def load_summaries(self, filename, waveform, storage='float64'):
+        """Attach the saved time index, pyramids and integrals of filename to waveform.
+
+        The arrays are opened memory-mapped. Returns False when none are saved.
+        """
+        entry = self.entry_path(self.key(filename, storage))
+        summary_path = os.path.join(entry, 'summary.json')
+        if not os.path.exists(summary_path):
+            return False
+        try:
+            with open(summary_path, 'r') as file:
+                meta = json.load(file)
+            arrays = {name: np.load(os.path.join(entry, f"{name}.npy"), mmap_mode='r')
+                      for name in meta['arrays']}
+            waveform.attach_summaries(meta, arrays)
+        except (OSError, ValueError, TypeError, KeyError):
+            # Half-evicted or from another version, prepare() rebuilds them
+            return False
+        return True
+
+    def save_summaries(self, filename, waveform, storage='float64'):
+        """Save the built time index, pyramids and integrals of waveform in the entry for filename.
+
+        A capture that is not cached itself, such as a raw binary one, gets
+        an entry holding only these.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self.entry_path(self.key(filename, storage))
+        meta, arrays = waveform.summaries()
+        meta['arrays'] = sorted(arrays)
+
+        os.makedirs(entry, exist_ok=True)
+        meta_path = os.path.join(entry, 'meta.json')
+        if not os.path.exists(meta_path):
+            with open(meta_path, 'w') as file:
+                json.dump({'source': os.path.abspath(filename), 'samples': len(waveform),
+                           'summaries_only': True}, file)
+        for name, arr in arrays.items():
+            np.save(os.path.join(entry, f"{name}.npy"), arr)
+        # The summary meta goes last, so a reader never finds a partial set
+        staging = os.path.join(entry, '.summary.json')
+        with open(staging, 'w') as file:
+            json.dump(meta, file)
+        os.replace(staging, os.path.join(entry, 'summary.json'))
+
+        self.evict(keep=entry)
+
+    def entries(self):
+        """Return (last_used, size, path) for every cache entry."""
+        if not os.path.isdir(self.directory):
+            return []
+
+        result = []
+        for name in os.listdir(self.directory):
+            entry = os.path.join(self.directory, name)
+            meta_path = os.path.join(entry, 'meta.json')
+            if name.startswith('.') or not os.path.exists(meta_path):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+            result.append((os.path.getmtime(meta_path), size, entry))
+        return result
+
+    def evict(self, keep=None):
+        """Delete least recently used entries until the cache fits max_bytes."""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class ResultCache:
+    """Bounded LRU memo of analysis results.
+
+    Keys are (data fingerprint, start_idx, end_idx, thresholds, analysis),
+    so a result is reused until one of those changes.
+    """
+
+    def __init__(self, max_entries=RESULT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def put(self, key, result):
+        """Store a result computed elsewhere, such as on a worker thread."""
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, key, compute):
+        """Return the cached result for key, calling compute() on a miss."""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return dict(self.entries[key])
+
+        self.misses += 1
+        result = compute()
+        self.put(key, result)
+        return dict(result)
+
+    def clear(self):
+        self.entries.clear()
+
+
+class _Span:
+    """One timing span of an enabled Profiler, recorded when the block exits."""
+
+    __slots__ = ('profiler', 'name', 'args', 'start')
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, self.start, perf_counter_ns(), self.args)
+        return False
+
+
+class Profiler:
+    """Named timing spans around the stages of a load, redraw or export.
+
+    While disabled, span() hands back one shared no-op context, so the
+    instrumented code pays only for the call. Spans may be recorded from
+    worker threads. The last duration of each name is kept for display and,
+    with tracing on, every span is also kept as a Chrome trace event that
+    write_trace() saves for chrome://tracing or Perfetto.
+    """
+
+    def __init__(self, enabled=False, trace=False, max_events=TRACE_EVENTS):
+        self.enabled = enabled or trace
+        self.trace = trace
+        self.last = OrderedDict()
+        self.events = deque(maxlen=max_events)
+        self.threads = {}
+        self.origin = perf_counter_ns()
+        self.lock = threading.Lock()
+
+    def span(self, name, **args):
+        """Context manager timing the enclosed block under name."""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name, args)
+
+    def record(self, name, start, end, args=None):
+        """Record a span given its perf_counter_ns() start and end."""
+        with self.lock:
+            # Most recent last, so the display reads in the order the stages ran
+            self.last.pop(name, None)
+            self.last[name] = (end - start) / 1e9
+            if self.trace:
+                thread = threading.get_ident()
+                self.threads.setdefault(thread, threading.current_thread().name)
+                self.events.append({'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': thread,
+                                    'ts': (start - self.origin) / 1e3,
+                                    'dur': (end - start) / 1e3, 'args': args or {}})
+
+    def summary(self, names=None):
+        """The last durations as 'name 12.3 ms' items joined for a status line."""
+        with self.lock:
+            last = list(self.last.items())
+        if names is not None:
+            last = [(name, seconds) for name, seconds in last if name in names]
+        return " | ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in last)
+
+    def write_trace(self, filename):
+        """Save the recorded spans in the Chrome trace event JSON format."""
+        with self.lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': thread,
+                     'args': {'name': name}} for thread, name in threads.items()]
+        with open(filename, 'w') as file:
+            json.dump({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}, file)
+
+
+_NO_SPAN = nullcontext()
+
+
+def profiled(method):
+    """Time every call of a method as a span named after it on the object's profiler."""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.profiler.enabled:
+            return method(self, *args, **kwargs)
+        with self.profiler.span(name):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def summary_storage(filename, storage):
+    """Storage precision the cached summaries of filename are keyed by.
+
+    Binary captures are always read at their own precision.
+    """
+    return 'float64' if is_binary_capture(filename) else storage
+
+
+def load_waveform(filename, cache=None, storage='float64', progress=None, is_cancelled=None):
+    """Load a capture at the given storage precision, going through the sidecar cache when one is given.
+
+    Raw binary captures are memory-mapped in place at their own precision
+    and skip the cache for their samples. Either way, the time index,
+    pyramids and integrals saved by prepare_waveform() on an earlier load
+    are attached memory-mapped.
+    """
+    if is_binary_capture(filename):
+        waveform = load_waveform_binary(filename)
+        if cache is not None:
+            cache.load_summaries(filename, waveform)
+        if progress is not None:
+            size = os.path.getsize(filename)
+            progress(size, size, len(waveform))
+        return waveform
+
+    if cache is not None:
+        waveform = cache.load(filename, storage)
+        if waveform is not None:
+            cache.load_summaries(filename, waveform, storage)
+            if progress is not None:
+                size = os.path.getsize(filename)
+                progress(size, size, len(waveform))
+            return waveform
+
+    waveform = load_waveform_csv(filename, storage=storage, progress=progress,
+                                 is_cancelled=is_cancelled)
+
+    if cache is not None:
+        try:
+            cache.save(filename, waveform, storage)
+        except OSError:
+            # A read-only or full cache directory should never block a load
+            pass
+    return waveform
+
+
+def prepare_waveform(filename, waveform, cache=None, storage='float64'):
+    """Prepare a loaded capture, saving what was built to the cache for the next load.
+
+    Summaries attached by load_waveform() are used as they are, so preparing
+    a reloaded capture reads none of its samples.
+    """
+    if waveform.prepared:
+        return
+    waveform.prepare()
+    if cache is not None:
+        try:
+            cache.save_summaries(filename, waveform, summary_storage(filename, storage))
+        except OSError:
+            # As with the samples, a cache that cannot be written never blocks a load
+            pass
+
+
+# Direction codes returned by find_crossings
+RISING = 1
+FALLING = -1
+
+# Crossing hysteresis as a fraction of the low-to-high reference swing
+CROSSING_HYSTERESIS = 0.02
+
+# Samples read from the start of a channel to estimate its noise
+NOISE_SAMPLES = 65536
+
+# A reverse-recovery lobe has to reach this many noise deviations below zero
+RECOVERY_NOISE_FACTOR = 12
+
+
+def percent_level(low, high, percent):
+    return low + (high - low) * percent / 100.0
+
+
+def iter_crossings(time, values, level, hysteresis=0.0, block_rows=ANALYSIS_BLOCK):
+    """Yield (times, directions) of the crossings of level, one block of samples at a time.
+
+    A crossing only counts once the signal has moved hysteresis / 2 past the
+    level on the far side, so noise riding on the level does not register as
+    extra edges. Each crossing time is linearly interpolated between the two
+    samples that bracket the level. The side of the last decisive sample and
+    the last raw sign change carry over between blocks, so the crossings are
+    those of one pass over the whole channel while only one block is ever
+    upcast to float64.
+    """
+    half = hysteresis / 2
+    state = None
+    last_flip = -1
+    for offset, block in channel_blocks(values, 0, None, block_rows):
+        # Samples that are decisively above or below the hysteresis band
+        above = block > level + half
+        events = np.flatnonzero(above | (block < level - half))
+        sides = above[events]
+
+        # A confirmed edge is an event whose side differs from the previous event's,
+        # the block's first event is compared with the last one of the block before
+        history = sides if state is None else np.concatenate([[state], sides])
+        change = np.flatnonzero(history[1:] != history[:-1]) + (1 if state is None else 0)
+        confirmed = offset + events[change]
+        directions = np.where(sides[change], RISING, FALLING).astype(np.int8)
+        if len(sides):
+            state = sides[-1]
+
+        # The level itself is crossed at the last raw sign change before each
+        # confirmation; sample j and j + 1 lie on opposite sides of flip j
+        side = block > level
+        flips = offset + np.flatnonzero(side[1:] != side[:-1])
+        if offset > 0 and (float(values[offset - 1]) > level) != side[0]:
+            flips = np.concatenate([[offset - 1], flips])
+        if len(confirmed):
+            candidates = np.concatenate([[last_flip], flips])
+            j = candidates[np.searchsorted(candidates, confirmed, side='left') - 1]
+            t0 = np.asarray(time[j], dtype=np.float64)
+            t1 = np.asarray(time[j + 1], dtype=np.float64)
+            v0 = np.asarray(values[j], dtype=np.float64)
+            v1 = np.asarray(values[j + 1], dtype=np.float64)
+            yield t0 + (level - v0) * (t1 - t0) / (v1 - v0), directions
+        if len(flips):
+            last_flip = int(flips[-1])
+
+
+def find_crossings(time, values, level, hysteresis=0.0):
+    """Return (times, directions) of every crossing of level, see iter_crossings()."""
+    found = list(iter_crossings(time, values, level, hysteresis))
+    if not found:
+        return np.empty(0), np.empty(0, dtype=np.int8)
+    return (np.concatenate([times for times, _ in found]),
+            np.concatenate([directions for _, directions in found]))
+
+
+def first_crossing(time, values, level, direction, hysteresis=0.0, after=-np.inf):
+    """Return the first crossing of level in direction at or after `after`, or nan.
+
+    The scan stops at the block holding it, so an early edge is found without
+    reading the rest of the record.
+    """
+    for times, directions in iter_crossings(time, values, level, hysteresis):
+        match = np.flatnonzero((directions == direction) & (times >= after))
+        if len(match):
+            return float(times[match[0]])
+    return np.nan
+
+
+def transition(time, values, start_pct, end_pct, direction, after=-np.inf):
+    """Return (t_start, t_end, level_start, level_end) of an edge between two percentage levels."""
+    low, high = state_levels(values)
+    hysteresis = CROSSING_HYSTERESIS * (high - low)
+    level_start = percent_level(low, high, start_pct)
+    level_end = percent_level(low, high, end_pct)
+    t_start = first_crossing(time, values, level_start, direction, hysteresis, after)
+    t_end = first_crossing(time, values, level_end, direction, hysteresis,
+                           t_start if not np.isnan(t_start) else after)
+    return t_start, t_end, level_start, level_end
+
+
+def slope(level_start, level_end, t_start, t_end):
+    if np.isnan(t_start) or np.isnan(t_end) or t_end == t_start:
+        return np.nan
+    return (level_end - level_start) / (t_end - t_start)
+
+
+def turn_off_params(time, vgs, vds, Is, high_pct=90, low_pct=10):
+    """Turn-off timing from one crossing pass per channel.
+
+    td(off) runs from VGS falling through high_pct to VDS rising through
+    low_pct, and toff from the same VGS crossing to IS falling through
+    low_pct. dV/dt and dI/dt are taken between the low_pct and high_pct
+    crossings of VDS and IS. Eoff is integrated over e_off_window, from VDS
+    rising through low_pct to IS falling through low_pct.
+    """
+    vgs_low, vgs_high = state_levels(vgs)
+    t_gate = first_crossing(time, vgs, percent_level(vgs_low, vgs_high, high_pct), FALLING,
+                            CROSSING_HYSTERESIS * (vgs_high - vgs_low))
+
+    vds_t_low, vds_t_high, vds_level_low, vds_level_high = transition(
+        time, vds, low_pct, high_pct, RISING, after=t_gate)
+    is_t_high, is_t_low, is_level_high, is_level_low = transition(
+        time, Is, high_pct, low_pct, FALLING, after=t_gate)
+
+    return {
+        'high_pct': high_pct,
+        'low_pct': low_pct,
+        'vgs_90': percent_level(vgs_low, vgs_high, high_pct),
+        'vds_10': vds_level_low,
+        'is_10': is_level_low,
+        'e_off_window': (vds_t_low, is_t_low),
+        't_off': is_t_low - t_gate,
+        'td_off': vds_t_low - t_gate,
+        'dv_dt_off': slope(vds_level_low, vds_level_high, vds_t_low, vds_t_high),
+        'di_dt_off': slope(is_level_high, is_level_low, is_t_high, is_t_low),
+    }
+
+
+def turn_on_params(time, vgs, vds, Is, high_pct=90, low_pct=10):
+    """Turn-on timing from one crossing pass per channel.
+
+    td(on) runs from VGS rising through low_pct to IS rising through
+    low_pct, and ton from the same VGS crossing to VDS falling through
+    low_pct. dV/dt and dI/dt are taken between the high_pct and low_pct
+    crossings of VDS and IS. Eon is integrated over e_on_window, from IS
+    rising through low_pct to VDS falling through low_pct.
+    """
+    vgs_low, vgs_high = state_levels(vgs)
+    t_gate = first_crossing(time, vgs, percent_level(vgs_low, vgs_high, low_pct), RISING,
+                            CROSSING_HYSTERESIS * (vgs_high - vgs_low))
+
+    vds_t_high, vds_t_low, vds_level_high, vds_level_low = transition(
+        time, vds, high_pct, low_pct, FALLING, after=t_gate)
+    is_t_low, is_t_high, is_level_low, is_level_high = transition(
+        time, Is, low_pct, high_pct, RISING, after=t_gate)
+
+    return {
+        'high_pct': high_pct,
+        'low_pct': low_pct,
+        'vgs_10': percent_level(vgs_low, vgs_high, low_pct),
+        'vds_90': vds_level_high,
+        'is_90': is_level_high,
+        'e_on_window': (is_t_low, vds_t_low),
+        't_on': vds_t_low - t_gate,
+        'td_on': is_t_low - t_gate,
+        'dv_dt_on': slope(vds_level_high, vds_level_low, vds_t_high, vds_t_low),
+        'di_dt_on': slope(is_level_low, is_level_high, is_t_low, is_t_high),
+    }
+
+
+def last_crossing(time, values, level, direction, hysteresis=0.0):
+    """Return the last crossing of level in direction, or nan."""
+    times, directions = find_crossings(time, values, level, hysteresis)
+    match = np.flatnonzero(directions == direction)
+    return float(times[match[-1]]) if len(match) else np.nan
+
+
+def noise_level(values, samples=NOISE_SAMPLES):
+    """Standard deviation of the noise on a channel, estimated from its first samples.
+
+    The steps between samples of white noise have sqrt(2) times its
+    deviation, and the median of their size ignores the few large steps
+    at edges.
+    """
+    steps = np.diff(np.asarray(values[:samples + 1], dtype=np.float64))
+    if len(steps) == 0:
+        return 0.0
+    return float(np.median(np.abs(steps))) / (0.6745 * np.sqrt(2))
+
+
+def reverse_recovery_params(time, Is, charge, after=-np.inf):
+    """Diode reverse-recovery figures of the deepest reverse-current lobe after `after`.
+
+    charge is the PrefixIntegral of Is. The lobe runs from the last falling
+    zero crossing before the current's minimum to its first return to zero
+    after it. Falling crossings are confirmed by a hysteresis band at least
+    RECOVERY_NOISE_FACTOR times the noise on the current, so noise around
+    zero is never taken for a recovery; without a lobe below the band,
+    Irrm, di/dt, trr, tf, ts and Qrr are nan.
+    """
+    start = 0 if np.isneginf(after) else search_time(time, after)
+    if len(Is) - start < 2:
+        return {'If': np.nan, 'Irrm': np.nan, 'di_dt': np.nan, 'trr': np.nan,
+                'tf': np.nan, 'ts': np.nan, 'Qrr': np.nan}
+
+    # IF (forward current before the lobe) and Irrm (peak reverse recovery current),
+    # found block by block so the channel is never upcast whole
+    peak = channel_argmin(Is, start)
+    forward = channel_argmax(Is, 0, peak + 1)
+    If = float(Is[forward])
+    Irrm = float(Is[peak])
+    hysteresis = max(CROSSING_HYSTERESIS * (If - Irrm), RECOVERY_NOISE_FACTOR * noise_level(Is))
+
+    # trr starts at the zero crossing into the lobe
+    lead_time, lead = channel_window(time, start, peak + 1), channel_window(Is, start, peak + 1)
+    t1 = last_crossing(lead_time, lead, 0.0, FALLING, hysteresis)
+    if np.isnan(t1):
+        return {'If': If, 'Irrm': np.nan, 'di_dt': np.nan, 'trr': np.nan,
+                'tf': np.nan, 'ts': np.nan, 'Qrr': np.nan}
+
+    # and ends at its first return to zero; the lobe's bottom is far below the
+    # band, so noise cannot fake a return from it
+    rise = peak
+    for offset, block in channel_blocks(Is, peak):
+        returned = np.flatnonzero(block >= 0)
+        if len(returned):
+            rise = offset + int(returned[0])
+            break
+    if Is[rise] >= 0:
+        v0, v1 = float(Is[rise - 1]), float(Is[rise])
+        t0, t_rise = float(time[rise - 1]), float(time[rise])
+        t2 = t0 - v0 * (t_rise - t0) / (v1 - v0)
+    else:
+        t2 = np.nan
+    trr = t2 - t1
+
+    # di/dt between the 60% and 40% points of the fall into the lobe
+    If_Irrm_diff = If - Irrm
+    sixty_percent = If - (0.6 * If_Irrm_diff)
+    forty_percent = If - (0.4 * If_Irrm_diff)
+    t60 = last_crossing(lead_time, lead, sixty_percent, FALLING, hysteresis)
+    t40 = last_crossing(lead_time, lead, forty_percent, FALLING, hysteresis)
+    di_dt = (sixty_percent - forty_percent)/(t60 - t40) if t60 != t40 else np.nan
+
+    # tf and ts components
+    tf = t1 - float(time[forward])
+    ts = t2 - t1
+
+    # Qrr (reverse recovery charge)
+    Qrr = abs(charge.between(t1, t2))
+
+    return {
+        'If': If,
+        'Irrm': Irrm,
+        'di_dt': di_dt,
+        'trr': trr,
+        'tf': tf,
+        'ts': ts,
+        'Qrr': Qrr
+    }
+
+
+# Signal conditioning
+
+# Histogram bins used to find the steady-state levels of a waveform
+STATE_BINS = 100
+
+
+def moving_average(values, window_size):
+    """Centered moving average in O(n) from a cumulative sum.
+
+    Sample i averages values[i - window_size // 2 : i + window_size // 2],
+    clipped at the ends of the record.
+    """
+    # Stored arrays are read as they are, the subtraction below upcasts them
+    if not isinstance(values, np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+    count = len(values)
+    half = window_size // 2
+    if count == 0 or half == 0:
+        return values.astype(np.float64)
+
+    # Remove the mean first so the running sum does not lose precision on large offsets
+    offset = float(np.mean(values, dtype=np.float64))
+    cumulative = np.empty(count + 1)
+    cumulative[0] = 0.0
+    np.subtract(values, offset, out=cumulative[1:], dtype=np.float64)
+    np.cumsum(cumulative[1:], out=cumulative[1:])
+
+    # Interior samples have full windows and reduce to one slice difference;
+    # only the clipped windows at either end need per-sample bounds
+    result = np.empty(count)
+    if count > 2 * half:
+        interior = result[half:count - half]
+        np.subtract(cumulative[2 * half:count], cumulative[:count - 2 * half], out=interior)
+        interior *= 1.0 / (2 * half)
+    index = np.concatenate([np.arange(min(half, count)), np.arange(max(count - half, half), count)])
+    start = np.maximum(index - half, 0)
+    end = np.minimum(index + half, count)
+    result[index] = (cumulative[end] - cumulative[start]) / (end - start)
+    result += offset
+    return result
+
+
+class MovingAverage(LazyChannel):
+    """moving_average() of a channel, computed for just the samples read.
+
+    Each read averages the requested samples plus window_size // 2 on either
+    side, so whole-record statistics of the smoothed signal are gathered
+    block by block without a full-length smoothed copy.
+    """
+
+    def __init__(self, values, window_size):
+        self.values = values
+        self.window_size = window_size
+        self.size = len(values)
+
+    def _values(self, key):
+        if not isinstance(key, slice) or key.indices(self.size)[2] != 1:
+            index = np.arange(self.size)[key]
+            if len(index) == 0:
+                return np.empty(0)
+            return self._values(slice(int(index.min()), int(index.max()) + 1))[index - index.min()]
+        start, stop, _ = key.indices(self.size)
+        if stop <= start:
+            return np.empty(0)
+        half = self.window_size // 2
+        first, last = max(start - half, 0), min(stop + half, self.size)
+        smoothed = moving_average(self.values[first:last], self.window_size)
+        return smoothed[start - first:stop - first]
+
+
+def state_levels(values, num_bins=STATE_BINS):
+    """Return the (low, high) steady-state levels as the histogram modes below and above the mean.
+
+    Each level is the centre of the most populated of num_bins equal-width
+    bins on its side of the mean, or 0 if that side has no populated bin.
+    """
+    count = len(values)
+    if count == 0:
+        return 0.0, 0.0
+
+    min_val, max_val = channel_extremes(values)
+    if max_val == min_val:
+        return min_val, max_val
+
+    bin_width = (max_val - min_val) / num_bins
+    scale = 1.0 / bin_width
+    counts = np.zeros(num_bins, dtype=np.int64)
+    total = 0.0
+    for _, block in channel_blocks(values):
+        # Truncation equals floor here since every offset is >= 0, and is far
+        # cheaper than floor division
+        bins = np.minimum(((block - min_val) * scale).astype(np.intp), num_bins - 1)
+        counts += np.bincount(bins, minlength=num_bins)
+        total += float(block.sum())
+
+    edges = min_val + np.arange(num_bins + 1) * bin_width
+    centers = (edges[:-1] + edges[1:]) / 2
+    mean = total / count
+
+    levels = []
+    for side in (centers < mean, centers > mean):
+        side_counts = np.where(side, counts, 0)
+        best = int(np.argmax(side_counts))
+        levels.append(float(centers[best]) if side_counts[best] > 0 else 0.0)
+    return levels[0], levels[1]
+
+
+def vgs_transient_params(vgs, pyramid=None):
+    """Static (steady-state) and dynamic (peak) VGS swing.
+
+    pyramid is the channel's MinMaxPyramid when one is built, whose coarsest
+    level gives the dynamic peaks without reading the samples.
+    """
+    if len(vgs) == 0:
+        return {'vgs_static': 0, 'vgs_dynamic': 0}
+
+    # Window size for moving average (adjust based on your sampling rate)
+    window_size = min(50, len(vgs) // 10)
+
+    # Steady state high and low levels (static) of the smoothed signal
+    static_low, static_high = state_levels(MovingAverage(vgs, window_size))
+
+    # Absolute peak values (dynamic)
+    extremes = pyramid.extremes() if pyramid is not None else None
+    dynamic_low, dynamic_high = extremes or channel_extremes(vgs)
+
+    return {
+        'vgs_static': static_high - static_low,
+        'vgs_dynamic': dynamic_high - dynamic_low,
+        'static_high': static_high,
+        'static_low': static_low,
+        'dynamic_high': dynamic_high,
+        'dynamic_low': dynamic_low
+    }
+
+
+def analyze_capture(waveform, high_pct=90, low_pct=10, thresholds=None):
+    """Run the turn-off, turn-on, reverse-recovery and VGS-transient analyses over a whole capture.
+
+    thresholds optionally maps 'turn_off' or 'turn_on' to its own
+    (high_pct, low_pct), as the app's tabs each have theirs.
+    """
+    thresholds = thresholds or {}
+    time, vgs, vds, Is = (waveform[name] for name in CHANNELS)
+    power = waveform.integral('power')
+
+    turn_off = turn_off_params(time, vgs, vds, Is,
+                               *thresholds.get('turn_off', (high_pct, low_pct)))
+    turn_off['e_off'] = power.between(*turn_off['e_off_window'])
+    turn_on = turn_on_params(time, vgs, vds, Is, *thresholds.get('turn_on', (high_pct, low_pct)))
+    turn_on['e_on'] = power.between(*turn_on['e_on_window'])
+
+    return {
+        'turn_off': turn_off,
+        'turn_on': turn_on,
+        'reverse_recovery': reverse_recovery_params(time, Is, waveform.integral('is')),
+        'vgs_transient': vgs_transient_params(vgs, waveform.pyramids.get('vgs')),
+    }
+
+
+# Multi-pulse event segmentation
+
+# Columns of the per-edge event table, after 'event', 'edge' and 't_edge'
+EVENT_FIELDS = ['td', 't_switch', 'dv_dt', 'di_dt', 'energy', 'Irrm', 'trr', 'Qrr']
+
+
+def find_switching_events(waveform):
+    """Return (edge, edge_idx, start_idx, end_idx) for every VGS edge in the capture.
+
+    Edges are the crossings of the VGS 50% level found in one pass; each
+    event's window runs halfway to the neighbouring edges so that it holds
+    the steady states on both sides of its own transition only.
+    """
+    time, vgs = waveform['time'], waveform['vgs']
+    low, high = state_levels(vgs)
+    times, directions = find_crossings(time, vgs, percent_level(low, high, 50),
+                                       CROSSING_HYSTERESIS * (high - low))
+
+    edges = [waveform.time_index.index_at(t) for t in times]
+    bounds = [0] + [(a + b) // 2 for a, b in zip(edges[:-1], edges[1:])] + [len(waveform) - 1]
+    return [('turn_on' if direction == RISING else 'turn_off', edge, bounds[k], bounds[k + 1])
+            for k, (edge, direction) in enumerate(zip(edges, directions))]
+
+
+def analyze_event(waveform, edge, edge_idx, start_idx, end_idx, high_pct=90, low_pct=10):
+    """Switching figures of one segmented edge.
+
+    Its reverse recovery is looked for after the VGS edge only, so noise on
+    the current before the edge is never measured; edges without a recovery
+    lobe get nan for Irrm, trr and Qrr.
+    """
+    time, vgs, vds, Is = (channel_window(waveform[name], start_idx, end_idx + 1)
+                          for name in CHANNELS)
+
+    if edge == 'turn_on':
+        params = turn_on_params(time, vgs, vds, Is, high_pct, low_pct)
+        row = {'td': params['td_on'], 't_switch': params['t_on'], 'dv_dt': params['dv_dt_on'],
+               'di_dt': params['di_dt_on'],
+               'energy': waveform.integral('power').between(*params['e_on_window'])}
+    else:
+        params = turn_off_params(time, vgs, vds, Is, high_pct, low_pct)
+        row = {'td': params['td_off'], 't_switch': params['t_off'], 'dv_dt': params['dv_dt_off'],
+               'di_dt': params['di_dt_off'],
+               'energy': waveform.integral('power').between(*params['e_off_window'])}
+
+    recovery = reverse_recovery_params(time, Is, waveform.integral('is'),
+                                       after=float(waveform['time'][edge_idx]))
+    row.update({'Irrm': recovery['Irrm'], 'trr': recovery['trr'], 'Qrr': recovery['Qrr']})
+    return row
+
+
+def analyze_events(waveform, high_pct=90, low_pct=10, workers=None, thresholds=None):
+    """Segment a multi-pulse capture and analyze every edge on a thread pool.
+
+    Returns one row per edge with 'event', 'edge', 't_edge' and EVENT_FIELDS.
+    thresholds optionally maps 'turn_off' or 'turn_on' to its own
+    (high_pct, low_pct), applied to the falling or rising edges, as in
+    analyze_capture().
+    """
+    thresholds = thresholds or {}
+    events = find_switching_events(waveform)
+
+    # Build the shared structures once up front so the workers only read them
+    waveform.integral('is')
+    waveform.integral('power')
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            lambda event: analyze_event(waveform, *event,
+                                        *thresholds.get(event[0], (high_pct, low_pct))),
+            events))
+
+    rows = []
+    for number, ((edge, edge_idx, _, _), result) in enumerate(zip(events, results), start=1):
+        row = {'event': number, 'edge': edge, 't_edge': float(waveform['time'][edge_idx])}
+        row.update(result)
+        rows.append(row)
+    return rows
+
+
+def iter_events(waveform, high_pct=90, low_pct=10, thresholds=None):
+    """Yield the rows of analyze_events() one edge at a time, on the calling thread.
+
+    Only one edge window is analyzed at a time, so memory stays at about one
+    ANALYSIS_BLOCK of samples per channel however long the capture is.
+    """
+    thresholds = thresholds or {}
+    for number, event in enumerate(find_switching_events(waveform), start=1):
+        edge, edge_idx = event[:2]
+        row = {'event': number, 'edge': edge, 't_edge': float(waveform['time'][edge_idx])}
+        row.update(analyze_event(waveform, *event, *thresholds.get(edge, (high_pct, low_pct))))
+        yield row
+
+
+def event_statistics(rows):
+    """Return {edge: {field: {'count', 'mean', 'std', 'min', 'max'}}} ignoring nan values."""
+    statistics = {}
+    for edge in ('turn_on', 'turn_off'):
+        edge_rows = [row for row in rows if row['edge'] == edge]
+        if not edge_rows:
+            continue
+        statistics[edge] = {}
+        for field in EVENT_FIELDS:
+            values = np.array([row[field] for row in edge_rows], dtype=np.float64)
+            values = values[~np.isnan(values)]
+            if len(values) == 0:
+                continue
+            statistics[edge][field] = {
+                'count': len(values),
+                'mean': float(values.mean()),
+                'std': float(values.std()),
+                'min': float(values.min()),
+                'max': float(values.max()),
+            }
+    return statistics
+
+
+# Probe deskew
+
+
+class DelayedChannel(LazyChannel):
+    """values[i + shift] for every i, linearly interpolated for a fractional shift.
+
+    A positive shift reads later samples, moving the waveform earlier.
+    Samples that would come from beyond either end hold the end value. Only
+    the samples read are shifted.
+    """
+
+    def __init__(self, values, shift):
+        self.values = values
+        self.size = len(values)
+        self.whole = int(np.floor(shift))
+        self.fraction = shift - self.whole
+
+    def _values(self, key):
+        contiguous = isinstance(key, slice) and key.indices(self.size)[2] == 1
+        if isinstance(key, slice):
+            index = np.arange(*key.indices(self.size))
+        else:
+            index = np.where(key < 0, key + self.size, key)
+        if len(index) == 0:
+            return np.empty(0)
+        lower_index = np.clip(index + self.whole, 0, self.size - 1)
+        upper_index = np.clip(index + self.whole + 1, 0, self.size - 1)
+
+        if contiguous:
+            # One contiguous read covers both neighbours, friendlier to a memory map
+            first = int(lower_index[0])
+            stretch = np.asarray(self.values[first:int(upper_index[-1]) + 1], dtype=np.float64)
+            read = lambda positions: stretch[positions - first]
+        else:
+            read = lambda positions: np.asarray(self.values[positions], dtype=np.float64)
+
+        lower = read(lower_index)
+        if self.fraction:
+            upper = read(upper_index)
+            lower += (upper - lower) * self.fraction
+        return lower
+
+
+class InterpolatedChannel(LazyChannel):
+    """A channel linearly interpolated at the times of another time base plus skew.
+
+    Each read interpolates from just the stretch of the original samples
+    that brackets the requested times, which gives the same values as
+    np.interp over the whole record, held end values included.
+    """
+
+    def __init__(self, time, source_time, values, skew=0.0):
+        self.time = time
+        self.source_time = source_time
+        self.values = values
+        self.skew = skew
+        self.size = len(time)
+
+    def _values(self, key):
+        at = np.asarray(self.time[key], dtype=np.float64) + self.skew
+        if len(at) == 0:
+            return at
+        first = max(search_time(self.source_time, float(at.min())) - 1, 0)
+        last = min(search_time(self.source_time, float(at.max())) + 1, len(self.source_time))
+        return np.interp(at, np.asarray(self.source_time[first:last], dtype=np.float64),
+                         np.asarray(self.values[first:last], dtype=np.float64))
+
+
+def fractional_delay(values, shift, block_rows=SCAN_BLOCK):
+    """Return values[i + shift] for every i as an array, see DelayedChannel."""
+    delayed = DelayedChannel(values, shift)
+    result = np.empty(len(values))
+    for start, block in channel_blocks(delayed, 0, None, block_rows):
+        result[start:start + len(block)] = block
+    return result
+
+
+class Deskew:
+    """Per-channel probe skew correction of a capture, computed on read.
+
+    A channel whose probe delays it by skew seconds is corrected by reading
+    it skew later: its value at t becomes its recorded value at t + skew.
+    On a uniform time base that is a DelayedChannel by skew / interval
+    samples; otherwise each channel is interpolated at the shifted times.
+    With resample set, the channels are first interpolated onto a uniform
+    time base spanning the same record with the same number of samples.
+
+    Corrected channels are lazy, so only the windows that are analyzed or
+    integrated are ever shifted, and a skew change copies nothing. The
+    corrected capture integrates its energy and charge per window
+    (WindowIntegral) rather than building a prefix over the whole record.
+    """
+
+    def __init__(self, waveform, resample=False):
+        self.waveform = waveform
+
+        index = waveform.time_index
+        self.resampled = resample and not index.is_uniform and index.dt > 0
+        if self.resampled:
+            self.time = UniformTime(index.t0, index.dt, len(waveform))
+        else:
+            self.time = waveform['time']
+        self.is_uniform = index.is_uniform or self.resampled
+        self.interval = index.dt
+
+    def base(self, name):
+        """The channel on the deskew time base, before any skew."""
+        if not self.resampled:
+            return self.waveform[name]
+        return self.interpolate(name, 0.0)
+
+    def interpolate(self, name, skew):
+        """The original channel interpolated at self.time + skew."""
+        return InterpolatedChannel(self.time, self.waveform['time'], self.waveform[name], skew)
+
+    def channel(self, name, skew):
+        """Channel name corrected for a probe delay of skew seconds."""
+        if not skew:
+            return self.base(name)
+        if self.is_uniform:
+            return DelayedChannel(self.base(name), skew / self.interval)
+        return self.interpolate(name, skew)
+
+    def corrected(self, skews):
+        """WaveformStore of every channel corrected by its skew in skews (seconds, default 0)."""
+        channels = {'time': self.time}
+        for name in CHANNELS[1:]:
+            channels[name] = self.channel(name, skews.get(name, 0.0))
+        # The source names the correction so the fingerprint differs from the original's
+        source = f"{self.waveform.source} deskewed {sorted(skews.items())} resampled {self.resampled}"
+        # Without resampling the time base is the capture's own, so is its index
+        time_index = None if self.resampled else self.waveform.time_index
+        waveform = WaveformStore(channels, units=self.waveform.units, source=source,
+                                 time_index=time_index)
+        for name in ('is', 'power'):
+            factors = [waveform['vds'], waveform['is']] if name == 'power' else [waveform[name]]
+            waveform.integrals[name] = WindowIntegral(waveform['time'], factors,
+                                                      waveform.time_index)
+        return waveform
+
+
+# Synthetic captures
+
+# Switching instants of the synthetic double pulse as fractions of the shot:
+# first pulse on and off, then second pulse on and off
+DOUBLE_PULSE_EDGES = (0.2, 0.5, 0.6, 0.75)
+
+
+def _ramp(time, start, width):
+    """0 before start, 1 after start + width, linear in between."""
+    return np.clip((time - start) / width, 0.0, 1.0)
+
+
+class DoublePulseGenerator:
+    """Synthetic double-pulse test waveforms with edge ringing and measurement noise.
+
+    Every edge follows the clamped inductive-load sequence: at turn-on the
+    gate rises, then the current, then the drain voltage falls; at turn-off
+    the gate falls, the voltage rises, then the current falls into a
+    half-sine reverse-recovery dip. Ringing is a damped sine after each
+    voltage and current rise, and the noise is Gaussian with a standard
+    deviation given as a fraction of each channel's swing.
+
+    channels() evaluates any span of shot time, so captures of any length
+    are built block by block and repeated shots can be streamed.
+    """
+
+    def __init__(self, duration=20e-6, v_bus=400.0, load_current=20.0, vgs_on=15.0, vgs_off=0.0,
+                 edge_time=50e-9, current_ramp=0.1, recovery_current=5.0, recovery_time=100e-9,
+                 ringing=0.1, ringing_frequency=50e6, ringing_decay=100e-9, noise=0.005, seed=0):
+        self.duration = duration
+        self.v_bus = v_bus
+        self.load_current = load_current
+        self.vgs_on = vgs_on
+        self.vgs_off = vgs_off
+        self.edge_time = edge_time
+        # Rise of the inductor current over the first pulse, as a fraction of load_current
+        self.current_ramp = current_ramp
+        self.recovery_current = recovery_current
+        self.recovery_time = recovery_time
+        # Ringing amplitude as a fraction of the bus voltage or load current
+        self.ringing = ringing
+        self.ringing_frequency = ringing_frequency
+        self.ringing_decay = ringing_decay
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+
+    def ring(self, time, start):
+        """Damped unit sine starting at start."""
+        elapsed = np.maximum(time - start, 0.0)
+        return (np.exp(-elapsed / self.ringing_decay) * np.sin(2 * np.pi * self.ringing_frequency * elapsed)
+                * self.ringing)
+
+    def channels(self, time):
+        """Return {'vgs', 'vds', 'is'} at the given times, in seconds from the shot start."""
+        time = np.asarray(time, dtype=np.float64)
+        edge = self.edge_time
+        on1, off1, on2, off2 = (fraction * self.duration for fraction in DOUBLE_PULSE_EDGES)
+
+        gate = _ramp(time, on1, edge) - _ramp(time, off1, edge)
+        gate += _ramp(time, on2, edge) - _ramp(time, off2, edge)
+        conducting = _ramp(time, on1 + edge, edge) - _ramp(time, off1 + 2 * edge, edge)
+        conducting += _ramp(time, on2 + edge, edge) - _ramp(time, off2 + 2 * edge, edge)
+        blocking = 1.0 - _ramp(time, on1 + 2 * edge, edge) + _ramp(time, off1 + edge, edge)
+        blocking -= _ramp(time, on2 + 2 * edge, edge) - _ramp(time, off2 + edge, edge)
+
+        # The inductor charges during both pulses and holds its current in between
+        on_time = np.clip(time - on1, 0.0, off1 - on1) + np.clip(time - on2, 0.0, off2 - on2)
+        load = self.load_current * (1.0 + self.current_ramp * on_time / (off1 - on1))
+
+        vgs = self.vgs_off + (self.vgs_on - self.vgs_off) * gate
+        vds = self.v_bus * blocking
+        Is = load * conducting
+        for t_on in (on1, on2):
+            Is += self.load_current * self.ring(time, t_on + 2 * edge)
+        for t_off in (off1, off2):
+            vds += self.v_bus * self.ring(time, t_off + 2 * edge)
+            phase = (time - (t_off + 3 * edge)) / self.recovery_time
+            inside = (phase > 0) & (phase < 1)
+            Is[inside] -= self.recovery_current * np.sin(np.pi * phase[inside])
+
+        if self.noise:
+            for values, swing in [(vgs, self.vgs_on - self.vgs_off), (vds, self.v_bus),
+                                  (Is, self.load_current)]:
+                values += self.rng.normal(0.0, self.noise * swing, len(time))
+        return {'vgs': vgs, 'vds': vds, 'is': Is}
+
+    def capture(self, samples, dtype=np.float64):
+        """Return one shot sampled uniformly over its duration as a WaveformStore."""
+        interval = self.duration / samples
+        channels = {'time': np.arange(samples, dtype=np.float64) * interval}
+        for name in CHANNELS[1:]:
+            channels[name] = np.empty(samples, dtype=dtype)
+        # Evaluate in blocks so the temporaries stay small at any sample count
+        for start in range(0, samples, SCAN_BLOCK):
+            block = slice(start, min(start + SCAN_BLOCK, samples))
+            for name, values in self.channels(channels['time'][block]).items():
+                channels[name][block] = values
+        return WaveformStore(channels, source=f"synthetic double pulse, {samples} samples")
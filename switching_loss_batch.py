@@ -0,0 +1,132 @@
+import os
+import sys
+import csv
+import glob
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from switching_core import (WaveformCache, load_waveform, analyze_capture, analyze_events,
+                            EVENT_FIELDS)
+
+# Summary columns for each analysis, in the order they appear in the app
+SUMMARY_FIELDS = {
+    'turn_off': ['t_off', 'td_off', 'dv_dt_off', 'di_dt_off', 'e_off'],
+    'turn_on': ['t_on', 'td_on', 'dv_dt_on', 'di_dt_on', 'e_on'],
+    'reverse_recovery': ['If', 'Irrm', 'di_dt', 'trr', 'tf', 'ts', 'Qrr'],
+    'vgs_transient': ['vgs_static', 'vgs_dynamic', 'static_high', 'static_low',
+                      'dynamic_high', 'dynamic_low'],
+}
+
+
+def summary_columns():
+    columns = ['file', 'samples', 'events', 'error']
+    for analysis, fields in SUMMARY_FIELDS.items():
+        columns.extend(f"{analysis}.{field}" for field in fields)
+    return columns
+
+
+def event_columns():
+    return ['file', 'event', 'edge', 't_edge'] + EVENT_FIELDS
+
+
+def analyze_file(filename, high_pct, low_pct, cache_dir, events=False):
+    """Analyze one capture in a worker process and return its summary row and event rows."""
+    row = {'file': filename}
+    try:
+        cache = WaveformCache(cache_dir) if cache_dir else None
+        waveform = load_waveform(filename, cache)
+        results = analyze_capture(waveform, high_pct, low_pct)
+        # The pool already has one process per core, keep event analysis in this one
+        event_rows = analyze_events(waveform, high_pct, low_pct, workers=1) if events else []
+    except Exception as e:
+        # One bad capture should not take down the whole run
+        row['error'] = f"{type(e).__name__}: {e}"
+        return row, []
+
+    row['samples'] = len(waveform)
+    row['events'] = len(event_rows)
+    for analysis, fields in SUMMARY_FIELDS.items():
+        for field in fields:
+            row[f"{analysis}.{field}"] = float(results[analysis].get(field, np.nan))
+    for event in event_rows:
+        event['file'] = filename
+    return row, event_rows
+
+
+def write_table(rows, columns, output, sheet_name):
+    if output.lower().endswith('.xlsx'):
+        import xlsxwriter
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'nan_inf_to_errors': True})
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, columns)
+        for row_idx, row in enumerate(rows, start=1):
+            worksheet.write_row(row_idx, 0, [row.get(column, '') for column in columns])
+        workbook.close()
+    else:
+        with open(output, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def run_batch(files, output, high_pct=90, low_pct=10, workers=None, cache_dir=None,
+              events_output=None):
+    """Analyze every file with a process pool and write one summary row per capture.
+
+    With events_output, every capture is also segmented into its switching
+    edges and the per-edge table of all captures is written there.
+    """
+    rows = []
+    event_rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(analyze_file, filename, high_pct, low_pct, cache_dir,
+                               events_output is not None): filename
+                   for filename in files}
+        for done, future in enumerate(as_completed(futures), start=1):
+            row, events = future.result()
+            rows.append(row)
+            event_rows.extend(events)
+            status = row.get('error', 'ok')
+            print(f"[{done}/{len(files)}] {os.path.basename(row['file'])}: {status}",
+                  file=sys.stderr)
+
+    # Completion order depends on scheduling, keep the table in file order
+    order = {filename: idx for idx, filename in enumerate(files)}
+    rows.sort(key=lambda row: order[row['file']])
+    write_table(rows, summary_columns(), output, "Summary")
+    if events_output is not None:
+        event_rows.sort(key=lambda row: (order[row['file']], row['event']))
+        write_table(event_rows, event_columns(), events_output, "Events")
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Headless switching-loss analysis of a directory of scope captures.")
+    parser.add_argument('directory', help="Directory containing capture CSV files")
+    parser.add_argument('-o', '--output', default='switching_summary.csv',
+                        help="Summary table to write (.csv or .xlsx)")
+    parser.add_argument('--pattern', default='*.csv', help="Glob pattern for capture files")
+    parser.add_argument('--high', type=int, default=90, help="High threshold (%%)")
+    parser.add_argument('--low', type=int, default=10, help="Low threshold (%%)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Worker processes (default: one per core)")
+    parser.add_argument('--events', default=None, metavar='FILE',
+                        help="Also segment multi-pulse captures and write the per-edge table here")
+    parser.add_argument('--cache-dir', default=None,
+                        help="Reuse and fill the binary sidecar cache in this directory")
+    args = parser.parse_args(argv)
+
+    files = sorted(glob.glob(os.path.join(args.directory, args.pattern)))
+    if not files:
+        parser.error(f"no files matching {args.pattern} in {args.directory}")
+
+    rows = run_batch(files, args.output, args.high, args.low, args.workers, args.cache_dir,
+                     args.events)
+    failed = sum(1 for row in rows if 'error' in row)
+    print(f"Wrote {len(rows)} rows to {args.output} ({failed} failed)", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
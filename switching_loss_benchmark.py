@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+
+# The apps are driven without showing a window
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import xlsxwriter
+from PySide6.QtWidgets import QApplication
+from switching_core import DoublePulseGenerator, WaveformCache, WaveformStore, write_waveform_csv
+
+# Benchmarked app modules by version label
+VERSIONS = {'v1': 'Mosfet_switching_Loss', 'v3': 'Mosfet_switching_Loss_v3'}
+
+STAGES = ['load', 'plot', 'analysis', 'export']
+
+# The names of the analyses timed in each version
+ANALYSES = ['calculate_turn_off_params', 'calculate_turn_on_params',
+            'calculate_reverse_recovery_params', 'calculate_vgs_transient_params']
+
+# Slower than baseline by more than this factor counts as a regression in --compare
+REGRESSION_FACTOR = 1.2
+
+
+def timed(results, version, samples, stage, function, repeat=1):
+    """Run function repeat times, record the fastest run and return its last result."""
+    best = np.inf
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        best = min(best, time.perf_counter() - start)
+    results.append({'version': version, 'samples': samples, 'stage': stage, 'seconds': best})
+    print(f"{version} {samples:>11,d} {stage:36s} {best * 1000:12.1f} ms", file=sys.stderr)
+    return value
+
+
+def run_v1(module, filename, samples, stages, workdir, repeat, results):
+    app = module.SwitchingAnalysisApp()
+    app.load_csv_data(filename)
+    if 'load' in stages:
+        timed(results, 'v1', samples, 'load', lambda: app.load_csv_data(filename), repeat)
+
+    if 'plot' in stages:
+        timed(results, 'v1', samples, 'plot_series', lambda: [
+            app.update_chart_series(chart) for chart in app.chart_series], repeat)
+
+    if 'analysis' in stages:
+        for analysis in ANALYSES:
+            timed(results, 'v1', samples, analysis, getattr(app, analysis), repeat)
+
+    if 'export' in stages:
+        def export():
+            workbook = xlsxwriter.Workbook(os.path.join(workdir, 'v1.xlsx'))
+            for sheet_name, view in [("Turn-off", app.turn_off_view), ("Turn-on", app.turn_on_view),
+                                     ("Reverse Recovery", app.reverse_recovery_view),
+                                     ("VGS Transient", app.vgs_transient_view)]:
+                app.export_tab_data(workbook, sheet_name, view)
+            workbook.close()
+        timed(results, 'v1', samples, 'export', export, repeat)
+    app.deleteLater()
+
+
+def run_v3(module, filename, samples, stages, workdir, repeat, results):
+    app = module.SwitchingAnalysisApp()
+    cache_dir = os.path.join(workdir, 'cache')
+
+    def load_cold():
+        # A fresh sidecar cache each run, so this is the CSV parse
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        app.cache = WaveformCache(cache_dir)
+        app.load_csv_data(filename)
+
+    load_cold()
+    if 'load' in stages:
+        timed(results, 'v3', samples, 'load', load_cold, repeat)
+        timed(results, 'v3', samples, 'load_cached', lambda: app.load_csv_data(filename), repeat)
+    # The LOD pyramids, time index and integrals built by the load worker, on a
+    # fresh store over the same channels each run so every repeat builds them
+    data = app.data
+    timed(results, 'v3', samples, 'prepare',
+          lambda: WaveformStore(data.channels, data.units, data.source).prepare(), repeat)
+    data.prepare()
+
+    if 'plot' in stages:
+        last = len(app.data) - 1
+
+        def plot_series():
+            # Time the envelopes, not a shared-model cache hit
+            app.model.envelopes.clear()
+            return [app.update_chart_series(view, 0, last, fit_time=True)
+                    for view in app.view_controls]
+        timed(results, 'v3', samples, 'plot_series', plot_series, repeat)
+
+    if 'analysis' in stages:
+        for analysis in ANALYSES:
+            def compute(analysis=analysis):
+                # Time the computation, not a result cache hit
+                app.results.clear()
+                return getattr(app, analysis)()
+            timed(results, 'v3', samples, analysis, compute, repeat)
+
+    if 'export' in stages:
+        timed(results, 'v3', samples, 'export',
+              lambda: app.create_export_worker(os.path.join(workdir, 'v3.xlsx')).run(), repeat)
+    app.deleteLater()
+
+
+def run_benchmark(sizes, versions, stages, generator, repeat=1, max_v1_samples=None, workdir=None):
+    """Time every stage of every version on a synthetic capture of each size.
+
+    Returns a list of {'version', 'samples', 'stage', 'seconds'} rows.
+    """
+    application = QApplication.instance() or QApplication(sys.argv[:1])
+    modules = {version: __import__(VERSIONS[version]) for version in versions}
+    runners = {'v1': run_v1, 'v3': run_v3}
+
+    results = []
+    own_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix='switching_benchmark_')
+    try:
+        for samples in sizes:
+            filename = os.path.join(workdir, f"capture_{samples}.csv")
+            write_waveform_csv(generator.capture(samples), filename)
+            for version in versions:
+                if version == 'v1' and max_v1_samples and samples > max_v1_samples:
+                    print(f"v1 {samples:>11,d} skipped (--max-v1-samples)", file=sys.stderr)
+                    continue
+                runners[version](modules[version], filename, samples, stages, workdir, repeat,
+                                 results)
+                application.processEvents()
+            os.remove(filename)
+    finally:
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, factor=REGRESSION_FACTOR):
+    """Print the ratio to a baseline run per measurement and return the regressions."""
+    reference = {(row['version'], row['samples'], row['stage']): row['seconds']
+                 for row in baseline['results']}
+    regressions = []
+    for row in results:
+        key = (row['version'], row['samples'], row['stage'])
+        if key not in reference or reference[key] <= 0:
+            continue
+        ratio = row['seconds'] / reference[key]
+        flag = ' REGRESSION' if ratio > factor else ''
+        print(f"{key[0]} {key[1]:>11,d} {key[2]:36s} {ratio:6.2f}x{flag}")
+        if flag:
+            regressions.append(dict(row, baseline=reference[key], ratio=ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time load, plot series, analyses and export of the switching-loss apps "
+                    "on synthetic double-pulse captures.")
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e4, 1e5, 1e6],
+                        help="Capture lengths in samples (10k to 50M)")
+    parser.add_argument('--versions', nargs='+', choices=list(VERSIONS), default=list(VERSIONS))
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per measurement, fastest kept")
+    parser.add_argument('--max-v1-samples', type=float, default=1e5,
+                        help="Skip v1 on larger captures (0: never skip)")
+    parser.add_argument('--ringing', type=float, default=0.1,
+                        help="Ringing amplitude as a fraction of bus voltage and load current")
+    parser.add_argument('--ringing-frequency', type=float, default=50e6, help="Ringing frequency (Hz)")
+    parser.add_argument('--noise', type=float, default=0.005,
+                        help="Noise standard deviation as a fraction of each channel's swing")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='switching_benchmark.json',
+                        help="JSON results file")
+    parser.add_argument('--compare', default=None, metavar='BASELINE',
+                        help="Earlier results file to compare against; exits 1 on a regression")
+    args = parser.parse_args(argv)
+
+    generator = DoublePulseGenerator(ringing=args.ringing, ringing_frequency=args.ringing_frequency,
+                                     noise=args.noise, seed=args.seed)
+    sizes = [int(size) for size in args.sizes]
+    results = run_benchmark(sizes, args.versions, args.stages, generator, args.repeat,
+                            int(args.max_v1_samples))
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'generator': {'ringing': args.ringing, 'ringing_frequency': args.ringing_frequency,
+                      'noise': args.noise, 'seed': args.seed},
+        'repeat': args.repeat,
+        'results': results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Wrote {len(results)} measurements to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,316 @@
+import io
+import os
+import sys
+import time
+import socket
+import argparse
+import numpy as np
+from switching_core import (CHANNELS, CSV_COLUMNS, WaveformStore, DoublePulseGenerator,
+                            read_csv_header, analyze_capture)
+
+# TCP port the generator scope listens on by default
+DEFAULT_PORT = 5025
+
+# Samples kept by the ring buffer, per channel
+RING_CAPACITY = 4 * 1024**2
+
+# Bytes read from a socket or tailed file per step
+READ_BYTES = 256 * 1024
+
+# Seconds between polls of an idle source
+POLL_INTERVAL = 0.05
+
+# Default trigger: VGS rising through 5 V, 20k-sample records with 4k before the trigger
+TRIGGER_LEVEL = 5.0
+RECORD_SAMPLES = 20000
+PRE_TRIGGER_SAMPLES = 4000
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of the most recent samples of every channel.
+
+    Samples are addressed by their absolute position in the stream, so a
+    record found by the trigger stays addressable until it is overwritten.
+    """
+
+    def __init__(self, capacity=RING_CAPACITY):
+        self.capacity = capacity
+        self.data = np.zeros((len(CHANNELS), capacity))
+        self.total = 0
+
+    @property
+    def first(self):
+        """Absolute index of the oldest sample still held."""
+        return max(self.total - self.capacity, 0)
+
+    def append(self, table):
+        """Append an (n, channels) block, dropping the oldest samples once full."""
+        added = len(table)
+        table = table[-self.capacity:]
+        count = len(table)
+        start = (self.total + added - count) % self.capacity
+        head = min(count, self.capacity - start)
+        self.data[:, start:start + head] = table[:head].T
+        self.data[:, :count - head] = table[head:].T
+        self.total += added
+
+    def window(self, start, end):
+        """Copy absolute samples start..end-1 as a (channels, n) array, or None if overwritten."""
+        if start < self.first or end > self.total or end < start:
+            return None
+        if end == start:
+            return self.data[:, :0].copy()
+        first, last = start % self.capacity, end % self.capacity
+        if first < last:
+            return self.data[:, first:last].copy()
+        return np.concatenate([self.data[:, first:], self.data[:, :last]], axis=1)
+
+
+class CsvStreamParser:
+    """Turns arbitrary chunks of capture CSV text into blocks of complete rows.
+
+    A header line, if the stream starts with one, sets the column order;
+    otherwise the columns are taken to be in CHANNELS order.
+    """
+
+    def __init__(self):
+        self.remainder = b''
+        self.columns = None
+
+    def feed(self, chunk):
+        """Return the (n, channels) rows completed by chunk."""
+        data = self.remainder + chunk
+        cut = data.rfind(b'\n') + 1
+        self.remainder = data[cut:]
+        lines = data[:cut].decode().splitlines()
+
+        if self.columns is None and lines:
+            try:
+                float(lines[0].split(',')[0])
+                self.columns = list(range(len(CHANNELS)))
+            except ValueError:
+                self.columns = read_csv_header(io.StringIO(lines[0] + '\n'))
+                lines = lines[1:]
+
+        lines = [line for line in lines if line.strip()]
+        if not lines:
+            return np.empty((0, len(CHANNELS)))
+        return np.loadtxt(lines, delimiter=',', usecols=self.columns, dtype=np.float64, ndmin=2)
+
+
+def socket_chunks(host, port, is_cancelled=None):
+    """Yield chunks received from a scope serving capture CSV over TCP."""
+    with socket.create_connection((host, port)) as connection:
+        connection.settimeout(POLL_INTERVAL)
+        while is_cancelled is None or not is_cancelled():
+            try:
+                chunk = connection.recv(READ_BYTES)
+            except socket.timeout:
+                continue
+            if not chunk:
+                return
+            yield chunk
+
+
+def tail_chunks(filename, is_cancelled=None):
+    """Yield chunks appended to a capture CSV as it grows, from its beginning."""
+    with open(filename, 'rb') as file:
+        while is_cancelled is None or not is_cancelled():
+            chunk = file.read(READ_BYTES)
+            if chunk:
+                yield chunk
+            else:
+                time.sleep(POLL_INTERVAL)
+
+
+def source_chunks(source, is_cancelled=None):
+    """Chunks from 'host:port' or an existing file path."""
+    if os.path.exists(source):
+        return tail_chunks(source, is_cancelled)
+    host, _, port = source.rpartition(':')
+    return socket_chunks(host or 'localhost', int(port), is_cancelled)
+
+
+class StreamAnalyzer:
+    """Triggers on the incoming stream and analyzes each record once it is complete.
+
+    Like a scope in normal trigger mode, a record is taken around every
+    rising crossing of trigger_level on VGS, with pre_samples before the
+    crossing, and further triggers are held off until the record ends. Only
+    newly arrived samples are scanned for triggers, and each record is
+    copied out of the ring buffer and analyzed on its own, so the work per
+    chunk is independent of how long the stream has been running.
+    """
+
+    def __init__(self, capacity=RING_CAPACITY, trigger_level=TRIGGER_LEVEL,
+                 record_samples=RECORD_SAMPLES, pre_samples=PRE_TRIGGER_SAMPLES,
+                 high_pct=90, low_pct=10, analyze=True, thresholds=None):
+        if record_samples > capacity:
+            raise ValueError("Record length must fit in the ring buffer")
+        self.ring = RingBuffer(capacity)
+        self.trigger_level = trigger_level
+        self.record_samples = record_samples
+        self.pre_samples = pre_samples
+        self.high_pct = high_pct
+        self.low_pct = low_pct
+        # Optional per-analysis (high_pct, low_pct), see analyze_capture()
+        self.thresholds = thresholds
+        self.analyze = analyze
+        self.scanned = 0
+        self.holdoff = 0
+        self.pending = []
+        self.events = 0
+        self.dropped = 0
+
+    def feed(self, table):
+        """Add rows and return one result per record completed by them.
+
+        Each result holds 'event', 't_trigger' and 'waveform', plus the
+        analyze_capture() results under 'analysis' when analyze is set.
+        """
+        if len(table) == 0:
+            return []
+        self.ring.append(table)
+        self.find_triggers()
+
+        results = []
+        while self.pending and self.pending[0] + self.record_samples - self.pre_samples <= self.ring.total:
+            trigger = self.pending.pop(0)
+            result = self.take_record(trigger)
+            if result is not None:
+                results.append(result)
+        return results
+
+    def find_triggers(self):
+        # One sample of overlap catches a crossing split across chunks
+        start = max(self.scanned - 1, self.ring.first)
+        vgs = self.ring.window(start, self.ring.total)[CHANNELS.index('vgs')]
+        crossings = np.flatnonzero((vgs[:-1] < self.trigger_level) & (vgs[1:] >= self.trigger_level))
+        for index in crossings + start + 1:
+            if index >= self.holdoff and index >= self.pre_samples:
+                self.pending.append(int(index))
+                self.holdoff = index + self.record_samples - self.pre_samples
+        self.scanned = self.ring.total
+
+    def take_record(self, trigger):
+        start = trigger - self.pre_samples
+        record = self.ring.window(start, start + self.record_samples)
+        if record is None:
+            # Overwritten before it was complete, the consumer is too slow
+            self.dropped += 1
+            return None
+
+        self.events += 1
+        waveform = WaveformStore(dict(zip(CHANNELS, record)), source=f"stream event {self.events}")
+        result = {'event': self.events,
+                  't_trigger': float(record[0][self.pre_samples]),
+                  'waveform': waveform}
+        if self.analyze:
+            result['analysis'] = analyze_capture(waveform, self.high_pct, self.low_pct,
+                                                 self.thresholds)
+        return result
+
+
+def scope_rows(generator, samples_per_shot, gap_samples):
+    """Yield (n, channels) blocks of back-to-back shots separated by idle gaps, forever."""
+    interval = generator.duration / samples_per_shot
+    period = samples_per_shot + gap_samples
+    position = 0
+    while True:
+        index = np.arange(position, position + samples_per_shot)
+        shot_time = (index % period) * interval
+        channels = generator.channels(shot_time)
+        yield np.column_stack([index * interval] + [channels[name] for name in CHANNELS[1:]])
+        position += samples_per_shot
+
+
+def format_rows(table):
+    """CSV text of a block of rows, in CHANNELS order."""
+    buffer = io.StringIO()
+    np.savetxt(buffer, table, delimiter=',', fmt='%.9g')
+    return buffer.getvalue().encode()
+
+
+def run_scope(output, shots, samples_per_shot, gap_samples, rate, port=DEFAULT_PORT):
+    """Act as a scope: stream synthetic double-pulse shots to a TCP client or an appended file.
+
+    rate paces the output in samples per second; 0 sends as fast as possible.
+    """
+    generator = DoublePulseGenerator()
+    header = (','.join(CSV_COLUMNS[name] for name in CHANNELS) + '\n').encode()
+    blocks = scope_rows(generator, samples_per_shot, gap_samples)
+    total = shots * (samples_per_shot + gap_samples)
+
+    def stream(write):
+        write(header)
+        started = time.perf_counter()
+        sent = 0
+        while sent < total:
+            table = next(blocks)[:total - sent]
+            write(format_rows(table))
+            sent += len(table)
+            if rate:
+                delay = sent / rate - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+
+    if output is None:
+        with socket.create_server(('localhost', port)) as server:
+            print(f"Scope listening on localhost:{port}", file=sys.stderr)
+            connection, _ = server.accept()
+            with connection:
+                stream(connection.sendall)
+    else:
+        with open(output, 'ab', buffering=0) as file:
+            stream(file.write)
+
+
+def listen(source, trigger_level, record_samples, pre_samples, high_pct, low_pct):
+    """Print one line per triggered record of a stream until it ends."""
+    analyzer = StreamAnalyzer(trigger_level=trigger_level, record_samples=record_samples,
+                              pre_samples=pre_samples, high_pct=high_pct, low_pct=low_pct)
+    parser = CsvStreamParser()
+    for chunk in source_chunks(source):
+        for result in analyzer.feed(parser.feed(chunk)):
+            analysis = result['analysis']
+            print(f"event {result['event']} at {result['t_trigger']:.6e} s: "
+                  f"Eon {analysis['turn_on']['e_on']:.3e} J, "
+                  f"Eoff {analysis['turn_off']['e_off']:.3e} J, "
+                  f"Qrr {analysis['reverse_recovery']['Qrr']:.3e} C, "
+                  f"VGS {analysis['vgs_transient']['vgs_dynamic']:.2f} V pk-pk")
+    print(f"{analyzer.events} events, {analyzer.dropped} dropped", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream switching captures from a scope or file.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    scope = commands.add_parser('scope', help="Generate double-pulse shots, standing in for a scope")
+    scope.add_argument('--file', default=None,
+                       help="Append CSV to this file instead of serving it over TCP")
+    scope.add_argument('--port', type=int, default=DEFAULT_PORT)
+    scope.add_argument('--shots', type=int, default=10)
+    scope.add_argument('--samples', type=int, default=RECORD_SAMPLES, help="Samples per shot")
+    scope.add_argument('--gap', type=int, default=RECORD_SAMPLES, help="Idle samples between shots")
+    scope.add_argument('--rate', type=float, default=0,
+                       help="Samples per second to pace the output (0: unpaced)")
+
+    watch = commands.add_parser('listen', help="Trigger on a stream and print each record's figures")
+    watch.add_argument('source', help="host:port of a scope or a CSV file being appended to")
+    watch.add_argument('--trigger', type=float, default=TRIGGER_LEVEL, help="VGS trigger level (V)")
+    watch.add_argument('--record', type=int, default=RECORD_SAMPLES, help="Samples per record")
+    watch.add_argument('--pre', type=int, default=PRE_TRIGGER_SAMPLES,
+                       help="Samples kept before the trigger")
+    watch.add_argument('--high', type=int, default=90, help="High threshold (%%)")
+    watch.add_argument('--low', type=int, default=10, help="Low threshold (%%)")
+    args = parser.parse_args(argv)
+
+    if args.command == 'scope':
+        run_scope(args.file, args.shots, args.samples, args.gap, args.rate, args.port)
+    else:
+        listen(args.source, args.trigger, args.record, args.pre, args.high, args.low)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,556 @@
+import sys
+import time
+import argparse
+import numpy as np
+import shiboken6
+from PySide6.QtWidgets import QApplication, QWidget
+from PySide6.QtCore import Qt, QObject, QPointF, QRectF, Signal
+from PySide6.QtGui import QPen, QColor, QPixmap, QPainter, QPolygonF
+from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
+
+# Space around the plot area for the title, tick labels and axis titles (left, top, right, bottom)
+PLOT_MARGINS = (80, 36, 80, 56)
+
+# Approximate number of grid divisions along each axis
+TICK_COUNT = 8
+
+# Dark theme matching the QtCharts setup in the apps
+BACKGROUND_COLOR = "#2B2B2B"
+TEXT_COLOR = "#FFFFFF"
+GRID_COLOR = "#404040"
+AXIS_COLOR = "#808080"
+CURSOR_COLOR = "#FFD700"
+
+
+def nice_ticks(low, high, count=TICK_COUNT):
+    """Return tick positions on a 1-2-5 step covering low..high."""
+    span = high - low
+    if not np.isfinite(span) or span <= 0:
+        return np.array([low])
+    raw_step = span / count
+    magnitude = 10 ** np.floor(np.log10(raw_step))
+    step = next(m * magnitude for m in (1, 2, 5, 10) if m * magnitude >= raw_step)
+    first = np.ceil(low / step) * step
+    ticks = np.arange(first, high + step * 1e-9, step)
+    # Rounding leaves zero as a tiny signed value that would print as -0
+    ticks[np.abs(ticks) < step * 1e-9] = 0.0
+    return ticks
+
+
+def pixel_envelope(x, y, start_idx, end_idx, pixels):
+    """Reduce x/y over start_idx..end_idx to one min/max pair per pixel column.
+
+    Short ranges come back unchanged. Longer ones are cut into equal buckets
+    and each bucket becomes a vertical stroke at its first x, which draws the
+    same image as the full trace at this width.
+    """
+    count = end_idx - start_idx
+    if count <= 2 * pixels:
+        return (np.asarray(x[start_idx:end_idx], dtype=np.float64),
+                np.asarray(y[start_idx:end_idx], dtype=np.float64))
+
+    bucket = -(-count // pixels)
+    buckets = -(-count // bucket)
+    full = (count // bucket) * bucket
+    mins = np.empty(buckets)
+    maxs = np.empty(buckets)
+    values = y[start_idx:start_idx + full].reshape(-1, bucket)
+    mins[:full // bucket] = values.min(axis=1)
+    maxs[:full // bucket] = values.max(axis=1)
+    if full < count:
+        # Last partial bucket
+        tail = y[start_idx + full:end_idx]
+        mins[-1] = tail.min()
+        maxs[-1] = tail.max()
+
+    bucket_x = np.asarray(x[start_idx:end_idx:bucket], dtype=np.float64)
+    env_x = np.repeat(bucket_x, 2)
+    env_y = np.empty(2 * buckets)
+    env_y[0::2] = mins
+    env_y[1::2] = maxs
+    return env_x, env_y
+
+
+def polygon_from_arrays(px, py):
+    """Build a QPolygonF by writing pixel coordinates straight into its point buffer."""
+    polygon = QPolygonF()
+    polygon.resize(len(px))
+    if len(px):
+        buffer = shiboken6.VoidPtr(polygon.data(), len(px) * 16, True)
+        points = np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)
+        points[:, 0] = px
+        points[:, 1] = py
+    return polygon
+
+
+class WaveformAxis(QObject):
+    """Value axis of a WaveformView, mirroring the parts of QValueAxis the apps use."""
+    rangeChanged = Signal(float, float)
+    # Range or title changed, the view redraws its static layer
+    changed = Signal()
+
+    def __init__(self, orientation, alignment, title=""):
+        super().__init__()
+        self._orientation = orientation
+        self._alignment = alignment
+        self._title = title
+        self._min = 0.0
+        self._max = 1.0
+
+    def orientation(self):
+        return self._orientation
+
+    def alignment(self):
+        return self._alignment
+
+    def titleText(self):
+        return self._title
+
+    def setTitleText(self, title):
+        self._title = title
+        self.changed.emit()
+
+    def min(self):
+        return self._min
+
+    def max(self):
+        return self._max
+
+    def setRange(self, min_value, max_value):
+        min_value, max_value = float(min_value), float(max_value)
+        if max_value < min_value:
+            min_value, max_value = max_value, min_value
+        if max_value == min_value:
+            # A flat trace still needs a drawable span
+            pad = abs(min_value) * 0.05 or 1.0
+            min_value, max_value = min_value - pad, max_value + pad
+        if (min_value, max_value) == (self._min, self._max):
+            return
+        self._min, self._max = min_value, max_value
+        self.changed.emit()
+        self.rangeChanged.emit(min_value, max_value)
+
+
+class WaveformSeries:
+    """A trace held as NumPy buffers, mirroring the parts of QLineSeries the apps use."""
+
+    def __init__(self, name="", color=Qt.white):
+        self._name = name
+        self._pen = QPen(QColor(color))
+        self._axes = []
+        self.view = None
+        self.x = np.empty(0)
+        self.y = np.empty(0)
+
+    def name(self):
+        return self._name
+
+    def setName(self, name):
+        self._name = name
+
+    def pen(self):
+        return self._pen
+
+    def setPen(self, pen):
+        self._pen = QPen(pen)
+
+    def attachAxis(self, axis):
+        self._axes.append(axis)
+
+    def attachedAxes(self):
+        return list(self._axes)
+
+    def replaceNp(self, x, y):
+        # Keep references only, the view decimates whatever is visible when it paints
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        if self.view is not None:
+            self.view.invalidate_traces()
+
+    def clear(self):
+        self.replaceNp(np.empty(0), np.empty(0))
+
+
+class WaveformView(QWidget):
+    """Oscilloscope-style plot drawing NumPy traces with QPainter.
+
+    The widget stands in for a QChartView and its QChart at once: chart()
+    returns the view itself, and axes(), addSeries(), plotArea(),
+    setRubberBand() and setInteractive() follow QtCharts closely enough for
+    the apps to drive either. Voltages use the left axis and currents the
+    right one.
+
+    Rendering is layered. Background, grid, ticks and titles are cached in
+    one pixmap and the traces in another, so cursors, the annotation and a
+    rubber band in progress only cost two blits and a few lines per frame.
+    Each trace is reduced to a min/max pair per pixel column of its visible
+    range before it is drawn.
+    """
+
+    def __init__(self, title="", parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.series = []
+        self.axis_x = WaveformAxis(Qt.Horizontal, Qt.AlignBottom, "Time (s)")
+        self.axis_y = WaveformAxis(Qt.Vertical, Qt.AlignLeft, "Voltage (V)")
+        self.axis_y2 = WaveformAxis(Qt.Vertical, Qt.AlignRight, "Current (A)")
+        for axis in [self.axis_x, self.axis_y, self.axis_y2]:
+            axis.changed.connect(self.invalidate_static)
+
+        self.rubber_band = QChartView.RubberBand.RectangleRubberBand
+        self.interactive = True
+        self.cursor_times = []
+        self.cursor_values = []
+        self.annotation = ""
+
+        self.static_layer = None
+        self.trace_layer = None
+        self.drag_origin = None
+        self.drag_current = None
+        self.setMinimumSize(320, 240)
+
+    # QtCharts-compatible surface
+
+    def chart(self):
+        return self
+
+    def setTitle(self, title):
+        self.title = title
+        self.invalidate_static()
+
+    def axes(self, orientation=None):
+        axes = [self.axis_x, self.axis_y, self.axis_y2]
+        return [axis for axis in axes if orientation is None or axis.orientation() == orientation]
+
+    def addSeries(self, series):
+        series.view = self
+        self.series.append(series)
+        self.invalidate_static()
+
+    def setRubberBand(self, rubber_band):
+        self.rubber_band = rubber_band
+
+    def setInteractive(self, interactive):
+        self.interactive = interactive
+
+    def plotArea(self):
+        left, top, right, bottom = PLOT_MARGINS
+        return QRectF(left, top, max(self.width() - left - right, 1),
+                      max(self.height() - top - bottom, 1))
+
+    # Overlays, drawn on every paint without touching the cached layers
+
+    def setCursors(self, times=(), values=()):
+        """Show vertical cursors at times and horizontal cursors at left-axis values."""
+        self.cursor_times = [t for t in times if np.isfinite(t)]
+        self.cursor_values = [v for v in values if np.isfinite(v)]
+        self.update()
+
+    def setAnnotation(self, text):
+        self.annotation = text
+        self.update()
+
+    # Layer caching
+
+    def invalidate_static(self):
+        self.static_layer = None
+        self.trace_layer = None
+        self.update()
+
+    def invalidate_traces(self):
+        self.trace_layer = None
+        self.update()
+
+    def resizeEvent(self, event):
+        self.invalidate_static()
+        super().resizeEvent(event)
+
+    def vertical_axes(self):
+        """Vertical axes with a series attached, the left one standing in when neither has."""
+        used = [axis for axis in [self.axis_y, self.axis_y2]
+                if any(axis in series.attachedAxes() for series in self.series)]
+        return used or [self.axis_y]
+
+    def to_pixels(self, axis, values):
+        """Map axis values to pixel coordinates in the plot area."""
+        area = self.plotArea()
+        span = (axis.max() - axis.min()) or 1.0
+        if axis.orientation() == Qt.Horizontal:
+            return area.left() + (values - axis.min()) * (area.width() / span)
+        return area.bottom() - (values - axis.min()) * (area.height() / span)
+
+    def from_pixel(self, axis, pixel):
+        area = self.plotArea()
+        span = axis.max() - axis.min()
+        if axis.orientation() == Qt.Horizontal:
+            return axis.min() + (pixel - area.left()) * span / area.width()
+        return axis.min() + (area.bottom() - pixel) * span / area.height()
+
+    def new_layer(self):
+        ratio = self.devicePixelRatioF()
+        layer = QPixmap(self.size() * ratio)
+        layer.setDevicePixelRatio(ratio)
+        layer.fill(Qt.transparent)
+        return layer
+
+    def render_static(self):
+        layer = self.new_layer()
+        layer.fill(QColor(BACKGROUND_COLOR))
+        painter = QPainter(layer)
+        area = self.plotArea()
+        metrics = painter.fontMetrics()
+
+        painter.setPen(QColor(TEXT_COLOR))
+        painter.drawText(QRectF(0, 0, self.width(), PLOT_MARGINS[1]), Qt.AlignCenter, self.title)
+
+        vertical = self.vertical_axes()
+        grid_pen = QPen(QColor(GRID_COLOR))
+        for axis in [self.axis_x] + vertical:
+            ticks = nice_ticks(axis.min(), axis.max())
+            pixels = self.to_pixels(axis, ticks)
+            for tick, pixel in zip(ticks, pixels):
+                label = f"{tick:.3g}"
+                if axis is self.axis_x:
+                    painter.setPen(grid_pen)
+                    painter.drawLine(QPointF(pixel, area.top()), QPointF(pixel, area.bottom()))
+                    painter.setPen(QColor(TEXT_COLOR))
+                    painter.drawText(QRectF(pixel - 50, area.bottom() + 4, 100, metrics.height()),
+                                     Qt.AlignHCenter | Qt.AlignTop, label)
+                    continue
+
+                # Only the first vertical axis draws grid lines, a second grid would clash
+                if axis is vertical[0]:
+                    painter.setPen(grid_pen)
+                    painter.drawLine(QPointF(area.left(), pixel), QPointF(area.right(), pixel))
+                painter.setPen(QColor(TEXT_COLOR))
+                if axis is self.axis_y:
+                    painter.drawText(QRectF(0, pixel - metrics.height() / 2, area.left() - 6,
+                                            metrics.height()), Qt.AlignRight | Qt.AlignVCenter, label)
+                else:
+                    painter.drawText(QRectF(area.right() + 6, pixel - metrics.height() / 2,
+                                            PLOT_MARGINS[2] - 6, metrics.height()),
+                                     Qt.AlignLeft | Qt.AlignVCenter, label)
+
+        painter.setPen(QColor(AXIS_COLOR))
+        painter.drawRect(area)
+
+        # Axis titles
+        painter.setPen(QColor(TEXT_COLOR))
+        painter.drawText(QRectF(area.left(), self.height() - metrics.height() - 4, area.width(),
+                                metrics.height()), Qt.AlignCenter, self.axis_x.titleText())
+        for axis, x in [(self.axis_y, metrics.height() + 4),
+                        (self.axis_y2, self.width() - metrics.height() - 4)]:
+            if axis not in vertical:
+                continue
+            painter.save()
+            painter.translate(x, area.center().y())
+            painter.rotate(-90 if axis is self.axis_y else 90)
+            painter.drawText(QRectF(-area.height() / 2, -metrics.height(), area.height(),
+                                    metrics.height()), Qt.AlignCenter, axis.titleText())
+            painter.restore()
+
+        # Legend along the bottom edge
+        x = area.left()
+        for series in self.series:
+            painter.setPen(series.pen())
+            y = self.height() - 2 * metrics.height() - 6
+            painter.drawLine(QPointF(x, y), QPointF(x + 16, y))
+            painter.setPen(QColor(TEXT_COLOR))
+            painter.drawText(QPointF(x + 20, y + metrics.ascent() / 2), series.name())
+            x += 40 + metrics.horizontalAdvance(series.name())
+        painter.end()
+        return layer
+
+    def render_traces(self):
+        layer = self.new_layer()
+        painter = QPainter(layer)
+        area = self.plotArea()
+        painter.setClipRect(area)
+        pixels = max(int(area.width()), 1)
+        for series in self.series:
+            if len(series.x) == 0:
+                continue
+            axis_y = next((axis for axis in series.attachedAxes()
+                           if axis.orientation() == Qt.Vertical), self.axis_y)
+
+            # One sample either side keeps the line running to the plot edges
+            start_idx = max(int(np.searchsorted(series.x, self.axis_x.min(), side='left')) - 1, 0)
+            end_idx = min(int(np.searchsorted(series.x, self.axis_x.max(), side='right')) + 1,
+                          len(series.x))
+            x, y = pixel_envelope(series.x, series.y, start_idx, end_idx, pixels)
+            if len(x) < 2:
+                continue
+            polygon = polygon_from_arrays(self.to_pixels(self.axis_x, x), self.to_pixels(axis_y, y))
+            painter.setPen(series.pen())
+            painter.drawPolyline(polygon)
+        painter.end()
+        return layer
+
+    def paintEvent(self, event):
+        if self.static_layer is None:
+            self.static_layer = self.render_static()
+        if self.trace_layer is None:
+            self.trace_layer = self.render_traces()
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self.static_layer)
+        painter.drawPixmap(0, 0, self.trace_layer)
+        area = self.plotArea()
+
+        painter.setPen(QPen(QColor(CURSOR_COLOR), 1, Qt.DashLine))
+        for t in self.cursor_times:
+            x = float(self.to_pixels(self.axis_x, t))
+            if area.left() <= x <= area.right():
+                painter.drawLine(QPointF(x, area.top()), QPointF(x, area.bottom()))
+        for value in self.cursor_values:
+            y = float(self.to_pixels(self.axis_y, value))
+            if area.top() <= y <= area.bottom():
+                painter.drawLine(QPointF(area.left(), y), QPointF(area.right(), y))
+
+        if self.annotation:
+            metrics = painter.fontMetrics()
+            box = metrics.boundingRect(QRectF(0, 0, area.width(), area.height()).toRect(),
+                                       Qt.AlignLeft, self.annotation)
+            box = QRectF(box).adjusted(-5, -5, 5, 5).translated(area.left() + 10, area.top() + 10)
+            painter.setPen(QColor(AXIS_COLOR))
+            painter.setBrush(QColor(BACKGROUND_COLOR))
+            painter.drawRoundedRect(box, 3, 3)
+            painter.setPen(QColor(TEXT_COLOR))
+            painter.drawText(box.adjusted(5, 5, -5, -5), Qt.AlignLeft, self.annotation)
+
+        band = self.rubber_band_rect()
+        if band is not None:
+            painter.setPen(QPen(QColor(TEXT_COLOR), 1, Qt.DotLine))
+            painter.setBrush(QColor(255, 255, 255, 40))
+            painter.drawRect(band)
+        painter.end()
+
+    # Rubber-band zoom, left drag zooms in and right click zooms out like QChartView
+
+    def rubber_band_rect(self):
+        if self.drag_origin is None or self.drag_current is None:
+            return None
+        area = self.plotArea()
+        band = QRectF(self.drag_origin, self.drag_current).normalized().intersected(area)
+        if self.rubber_band == QChartView.RubberBand.HorizontalRubberBand:
+            band.setTop(area.top())
+            band.setBottom(area.bottom())
+        elif self.rubber_band == QChartView.RubberBand.VerticalRubberBand:
+            band.setLeft(area.left())
+            band.setRight(area.right())
+        return band
+
+    def mousePressEvent(self, event):
+        if not self.interactive or self.rubber_band == QChartView.RubberBand.NoRubberBand:
+            return super().mousePressEvent(event)
+        if event.button() == Qt.LeftButton and self.plotArea().contains(event.position()):
+            self.drag_origin = event.position()
+            self.drag_current = event.position()
+        elif event.button() == Qt.RightButton:
+            self.zoom(0.5)
+
+    def mouseMoveEvent(self, event):
+        if self.drag_origin is not None:
+            self.drag_current = event.position()
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        band = self.rubber_band_rect()
+        self.drag_origin = self.drag_current = None
+        self.update()
+        if band is None or band.width() < 4 or band.height() < 4:
+            return
+        if self.rubber_band != QChartView.RubberBand.VerticalRubberBand:
+            self.axis_x.setRange(self.from_pixel(self.axis_x, band.left()),
+                                 self.from_pixel(self.axis_x, band.right()))
+        if self.rubber_band != QChartView.RubberBand.HorizontalRubberBand:
+            for axis in [self.axis_y, self.axis_y2]:
+                axis.setRange(self.from_pixel(axis, band.bottom()),
+                              self.from_pixel(axis, band.top()))
+
+    def zoom(self, factor):
+        """Scale the visible time range about its centre, factor > 1 zooms in."""
+        center = (self.axis_x.min() + self.axis_x.max()) / 2
+        half = (self.axis_x.max() - self.axis_x.min()) / (2 * factor)
+        self.axis_x.setRange(center - half, center + half)
+
+
+def synthetic_trace(count):
+    """A noisy double-pulse-like trace long enough to stress a renderer."""
+    rng = np.random.default_rng(0)
+    time = np.arange(count, dtype=np.float64) * 1e-9
+    values = np.where((np.arange(count) // max(count // 8, 1)) % 2 == 0, 400.0, 0.0)
+    values += rng.normal(0.0, 2.0, count)
+    return time, values
+
+
+def benchmark(sizes, renderers, width=1200, height=600):
+    """Time data upload, first frame, a zoomed frame and an unchanged repaint per renderer."""
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = []
+    for count in sizes:
+        time_values, values = synthetic_trace(count)
+        for renderer in renderers:
+            if renderer == 'painter':
+                view = WaveformView("Benchmark")
+                series = WaveformSeries("VDS", Qt.red)
+                view.addSeries(series)
+                series.attachAxis(view.axis_x)
+                series.attachAxis(view.axis_y)
+                axis_x, axis_y = view.axis_x, view.axis_y
+            else:
+                chart = QChart()
+                axis_x, axis_y = QValueAxis(), QValueAxis()
+                chart.addAxis(axis_x, Qt.AlignBottom)
+                chart.addAxis(axis_y, Qt.AlignLeft)
+                series = QLineSeries()
+                chart.addSeries(series)
+                series.attachAxis(axis_x)
+                series.attachAxis(axis_y)
+                view = QChartView(chart)
+            view.resize(width, height)
+
+            timings = {'renderer': renderer, 'points': count}
+            start = time.perf_counter()
+            series.replaceNp(time_values, values)
+            axis_x.setRange(time_values[0], time_values[-1])
+            axis_y.setRange(float(values.min()), float(values.max()))
+            timings['set_data'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            view.grab()
+            timings['first_frame'] = time.perf_counter() - start
+
+            span = time_values[-1] - time_values[0]
+            start = time.perf_counter()
+            axis_x.setRange(time_values[0] + 0.45 * span, time_values[0] + 0.55 * span)
+            view.grab()
+            timings['zoom_frame'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            view.grab()
+            timings['repaint'] = time.perf_counter() - start
+
+            results.append(timings)
+            print(f"{renderer:8s} {count:>11,d} points: " +
+                  ", ".join(f"{key} {timings[key] * 1000:9.1f} ms"
+                            for key in ['set_data', 'first_frame', 'zoom_frame', 'repaint']))
+            view.deleteLater()
+            app.processEvents()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the QPainter waveform view against QChartView.")
+    parser.add_argument('--sizes', type=float, nargs='+', default=[1e6, 1e7, 5e7],
+                        help="Trace lengths in points")
+    parser.add_argument('--renderers', nargs='+', choices=['painter', 'charts'],
+                        default=['painter', 'charts'])
+    args = parser.parse_args(argv)
+    benchmark([int(size) for size in args.sizes], args.renderers)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())